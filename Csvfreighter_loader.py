@@ -4,21 +4,264 @@ Bulk loading using CSVFreighter from agefreighter package.
 Uses async API to load data from CSV files.
 """
 
+import ast
 import asyncio
+import csv
+import io
+import json
 import os
 import sys
 import pandas as pd
+from multiprocessing import cpu_count
 from agefreighter import Factory
 from config import DB_CONFIG, GRAPH_NAME
+from db_connection import get_connection
+from load_to_age import _copy_text_escape
 
-async def load_with_csvfreighter(graph_name=GRAPH_NAME, drop_graph=False):
+try:
+    import pyarrow.csv as pacsv
+except ImportError:  # optional: falls back to pandas' single-threaded parser
+    pacsv = None
+
+# Rows per merge/write batch when streaming combined CSVs to disk
+CSV_CHUNK_ROWS = 100_000
+
+def _parse_props(p):
+    """Parse one serialized properties cell (JSON, or a legacy dict repr)."""
+    if not isinstance(p, str):
+        return p
+    try:
+        return json.loads(p)
+    except ValueError:
+        # Older CSVs stored str(dict); literal_eval only accepts
+        # literals, unlike eval which compiles and runs arbitrary Python
+        return ast.literal_eval(p)
+
+def read_csv_fast(path):
+    """Read a whole CSV into pandas, via pyarrow's parallel parser if present."""
+    if pacsv is not None:
+        read_options = pacsv.ReadOptions(block_size=8 << 20, use_threads=True)
+        return pacsv.read_csv(path, read_options=read_options).to_pandas()
+    return pd.read_csv(path)
+
+def drop_graph_indexes(cur, graph_name):
+    """Drop non-constraint indexes in the graph's schema for bulk loading.
+
+    Returns the captured CREATE INDEX statements so the caller can
+    rebuild them once the load finishes -- a single full-table build is
+    much cheaper than per-row incremental index maintenance.
+    """
+    cur.execute("""
+        SELECT indexname, indexdef FROM pg_indexes
+        WHERE schemaname = %s
+        AND indexname NOT IN (SELECT conname FROM pg_constraint);
+    """, (graph_name,))
+    index_defs = []
+    for indexname, indexdef in cur.fetchall():
+        index_defs.append(indexdef)
+        cur.execute(f'DROP INDEX "{graph_name}"."{indexname}";')
+    if index_defs:
+        print(f"Deferred {len(index_defs)} indexes until after load")
+    return index_defs
+
+def rebuild_graph_indexes(cur, index_defs):
+    """Re-create indexes captured by drop_graph_indexes."""
+    for indexdef in index_defs:
+        cur.execute(indexdef)
+    if index_defs:
+        print(f"Rebuilt {len(index_defs)} indexes")
+
+def _ensure_label(cur, graph_name, label, kind):
+    """Create a vertex ('v') or edge ('e') label if it does not exist yet."""
+    cur.execute("""
+        SELECT 1 FROM ag_catalog.ag_label
+        WHERE name = %s
+        AND graph = (SELECT graphid FROM ag_catalog.ag_graph WHERE name = %s);
+    """, (label, graph_name))
+    if not cur.fetchone():
+        creator = 'create_vlabel' if kind == 'v' else 'create_elabel'
+        cur.execute(f"SELECT {creator}(%s, %s);", (graph_name, label))
+
+def fast_ingest(graph_name=GRAPH_NAME):
+    """Bulk-load nodes.csv/edges.csv straight into AGE's label tables.
+
+    Bypasses CSVFreighter entirely: vertices and edges stream through
+    COPY ... FROM STDIN into the per-label storage tables, with a single
+    commit (one fsync) at the end. Intended for an empty/new graph.
+    """
+    print("="*70)
+    print("FAST INGEST (COPY ... FROM STDIN)")
+    print("="*70)
+
+    with get_connection() as conn:
+        cur = conn.cursor()
+        try:
+            # Bulk-load session settings: no per-commit fsync wait, more
+            # memory for the implicit index builds
+            cur.execute("SET synchronous_commit = off;")
+            cur.execute("SET maintenance_work_mem = '1GB';")
+
+            cur.execute("SELECT * FROM ag_catalog.ag_graph WHERE name = %s;", (graph_name,))
+            if not cur.fetchone():
+                cur.execute("SELECT create_graph(%s);", (graph_name,))
+
+            # Build indexes after the load instead of maintaining them per
+            # row, and skip trigger firing while COPY runs
+            index_defs = drop_graph_indexes(cur, graph_name)
+            cur.execute("SET session_replication_role = replica;")
+
+            nodes_df = read_csv_fast('nodes.csv')
+            nodes_df['label'] = nodes_df['label'].astype('category')
+            nodes_df['properties'] = nodes_df['properties'].map(_parse_props)
+
+            # Vertices: one COPY per label into its storage table; the id
+            # column fills from the label sequence
+            for label, group in nodes_df.groupby('label', observed=True):
+                _ensure_label(cur, graph_name, label, 'v')
+                buf = io.StringIO()
+                for node_id, props in zip(group['id'], group['properties']):
+                    props = dict(props)
+                    props['id'] = int(node_id)
+                    buf.write(_copy_text_escape(json.dumps(props)) + '\n')
+                buf.seek(0)
+                cur.copy_expert(
+                    f'COPY "{graph_name}"."{label}"(properties) FROM STDIN', buf)
+                print(f"  ✓ Copied {len(group):,} {label} vertices")
+
+            # Map our external node ids to AGE's internal graphids so edges
+            # can COPY with resolved endpoints
+            id_map = {}
+            for label in nodes_df['label'].unique():
+                cur.execute(f'''
+                    SELECT id, agtype_access_operator(properties, '"id"'::agtype)
+                    FROM "{graph_name}"."{label}";
+                ''')
+                for graphid, prop_id in cur.fetchall():
+                    id_map[int(str(prop_id))] = graphid
+
+            edges_df = read_csv_fast('edges.csv')
+            edges_df['edge_label'] = edges_df['edge_label'].astype('category')
+            edges_df['properties'] = edges_df['properties'].map(_parse_props)
+
+            loaded_edges = 0
+            for edge_label, group in edges_df.groupby('edge_label', observed=True):
+                _ensure_label(cur, graph_name, edge_label, 'e')
+                buf = io.StringIO()
+                for from_id, to_id, props in zip(group['from_id'], group['to_id'],
+                                                 group['properties']):
+                    buf.write(f"{id_map[from_id]}\t{id_map[to_id]}\t"
+                              f"{_copy_text_escape(json.dumps(props or {}))}\n")
+                buf.seek(0)
+                cur.copy_expert(
+                    f'COPY "{graph_name}"."{edge_label}"(start_id, end_id, properties) '
+                    f'FROM STDIN', buf)
+                loaded_edges += len(group)
+                print(f"  ✓ Copied {len(group):,} {edge_label} edges")
+
+            cur.execute("SET session_replication_role = DEFAULT;")
+            rebuild_graph_indexes(cur, index_defs)
+
+            conn.commit()
+
+            print("\n" + "="*70)
+            print("FAST INGEST COMPLETE")
+            print(f"Total nodes: {len(nodes_df):,}")
+            print(f"Total edges: {loaded_edges:,}")
+            print("="*70 + "\n")
+        except Exception as e:
+            conn.rollback()
+            print(f"\n✗ Fast ingest failed: {e}")
+            raise
+        finally:
+            cur.close()
+
+def prepare_label_csv(edge_label, label_edges, node_props_by_label, node_labels):
+    """Build the combined CSV for one edge label and return load metadata."""
+    # Find source and target vertex labels from the first edge
+    start_label = node_labels[label_edges['from_id'].iloc[0]]
+    end_label = node_labels[label_edges['to_id'].iloc[0]]
+
+    start_props_df = node_props_by_label[start_label]
+    end_props_df = node_props_by_label[end_label]
+
+    print(f"\nPreparing CSV for: {start_label} -[{edge_label}]-> {end_label}")
+
+    csv_filename = f'csvfreighter_{start_label}_{edge_label}_{end_label}.csv'
+
+    # The header is fixed for the whole label: vertex columns come from
+    # the per-label property frames and edge keys from the first edge
+    # (all edges of a label share one generator). Computing it up front
+    # lets every chunk be written positionally against one template.
+    first_edge_props = label_edges['properties'].iloc[0] or {}
+    columns = ['start_id',
+               *('start_' + c for c in start_props_df.columns),
+               *('edge_' + k for k in dict.fromkeys(first_edge_props)),
+               'end_id',
+               *('end_' + c for c in end_props_df.columns)]
+
+    # Stream the joined rows to disk in chunks instead of
+    # materializing one DataFrame (list + frame + CSV buffer) per label
+    row_count = 0
+    with open(csv_filename, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for chunk_start in range(0, len(label_edges), CSV_CHUNK_ROWS):
+            batch = label_edges.iloc[chunk_start:chunk_start + CSV_CHUNK_ROWS]
+
+            # Join start/end vertex properties onto the edges in bulk
+            start_cols = start_props_df.loc[batch['from_id']].add_prefix('start_').reset_index(drop=True)
+            edge_cols = pd.json_normalize(list(batch['properties'])).add_prefix('edge_')
+            end_cols = end_props_df.loc[batch['to_id']].add_prefix('end_').reset_index(drop=True)
+
+            chunk_df = pd.concat(
+                [
+                    batch['from_id'].rename('start_id').reset_index(drop=True),
+                    start_cols,
+                    edge_cols,
+                    batch['to_id'].rename('end_id').reset_index(drop=True),
+                    end_cols,
+                ],
+                axis=1,
+            ).reindex(columns=columns)
+
+            writer.writerows(chunk_df.itertuples(index=False, name=None))
+            row_count += len(chunk_df)
+
+    print(f"  Created {csv_filename} with {row_count:,} rows")
+
+    # Get property column names, stripping the prefixes
+    start_props = [col[len('start_'):] for col in columns if col.startswith('start_') and col != 'start_id']
+    edge_props = [col[len('edge_'):] for col in columns if col.startswith('edge_')]
+    end_props = [col[len('end_'):] for col in columns if col.startswith('end_') and col != 'end_id']
+
+    return {
+        'edge_label': edge_label,
+        'start_label': start_label,
+        'end_label': end_label,
+        'csv_filename': csv_filename,
+        'start_props': start_props,
+        'edge_props': edge_props,
+        'end_props': end_props,
+    }
+
+async def load_with_csvfreighter(graph_name=GRAPH_NAME, drop_graph=False,
+                                 pool_min=None, pool_max=None,
+                                 defer_indexes=False):
     """
     Load graph data using CSVFreighter.
     
     Note: CSVFreighter expects CSV files with specific format:
     - Each CSV contains: start vertex, edge, end vertex data
     - We need to prepare CSVs in this format
+
+    Pool sizing defaults scale with the host's core count; tune with
+    --pool-min/--pool-max if the DB server has more (or fewer) spare cores.
     """
+
+    if pool_min is None:
+        pool_min = min(cpu_count(), 25)
+    if pool_max is None:
+        pool_max = max(2 * cpu_count(), pool_min)
     
     print("="*70)
     print("CSVFREIGHTER BULK LOADING")
@@ -35,10 +278,11 @@ async def load_with_csvfreighter(graph_name=GRAPH_NAME, drop_graph=False):
     
     # Connect to database
     print("\nConnecting to database...")
+    print(f"Connection pool: min={pool_min}, max={pool_max}")
     await instance.connect(
         dsn=dsn,
-        max_connections=16,
-        min_connections=4,
+        max_connections=pool_max,
+        min_connections=pool_min,
     )
     print("✓ Connected")
     
@@ -49,108 +293,107 @@ async def load_with_csvfreighter(graph_name=GRAPH_NAME, drop_graph=False):
     print("─"*70)
     
     # Load our generated data
-    nodes_df = pd.read_csv('nodes.csv')
-    edges_df = pd.read_csv('edges.csv')
-    
-    print(f"Found {len(nodes_df):,} nodes and {len(edges_df):,} edges")
-    
-    # Group edges by type and create combined CSVs
-    for edge_label in edges_df['edge_label'].unique():
-        label_edges = edges_df[edges_df['edge_label'] == edge_label].copy()
-        
-        # Get first edge to determine vertex types
-        first_edge = label_edges.iloc[0]
-        
-        # Find source and target vertex labels
-        from_node = nodes_df[nodes_df['id'] == first_edge['from_id']].iloc[0]
-        to_node = nodes_df[nodes_df['id'] == first_edge['to_id']].iloc[0]
-        
-        start_label = from_node['label']
-        end_label = to_node['label']
-        
-        print(f"\nPreparing CSV for: {start_label} -[{edge_label}]-> {end_label}")
-        
-        # Build combined CSV
-        combined_rows = []
-        
-        for _, edge in label_edges.iterrows():
-            # Get start vertex
-            start_vertex = nodes_df[nodes_df['id'] == edge['from_id']].iloc[0]
-            start_props = eval(start_vertex['properties']) if isinstance(start_vertex['properties'], str) else start_vertex['properties']
-            
-            # Get end vertex
-            end_vertex = nodes_df[nodes_df['id'] == edge['to_id']].iloc[0]
-            end_props = eval(end_vertex['properties']) if isinstance(end_vertex['properties'], str) else end_vertex['properties']
-            
-            # Get edge props
-            edge_props = eval(edge['properties']) if isinstance(edge['properties'], str) else edge['properties']
-            
-            # Combine into one row
-            row = {}
-            
-            # Add start vertex properties with prefix
-            row['start_id'] = edge['from_id']
-            for k, v in start_props.items():
-                row[f'start_{k}'] = v
-            
-            # Add edge properties
-            for k, v in edge_props.items():
-                row[f'edge_{k}'] = v
-            
-            # Add end vertex properties with prefix
-            row['end_id'] = edge['to_id']
-            for k, v in end_props.items():
-                row[f'end_{k}'] = v
-            
-            combined_rows.append(row)
-        
-        # Create DataFrame and save
-        combined_df = pd.DataFrame(combined_rows)
-        csv_filename = f'csvfreighter_{start_label}_{edge_label}_{end_label}.csv'
-        combined_df.to_csv(csv_filename, index=False)
-        
-        print(f"  Created {csv_filename} with {len(combined_df):,} rows")
-        
-        # Get property column names
-        start_prop_cols = [col for col in combined_df.columns if col.startswith('start_') and col != 'start_id']
-        edge_prop_cols = [col for col in combined_df.columns if col.startswith('edge_')]
-        end_prop_cols = [col for col in combined_df.columns if col.startswith('end_') and col != 'end_id']
-        
-        # Strip prefixes for property names
-        start_props = [col.replace('start_', '') for col in start_prop_cols]
-        edge_props_list = [col.replace('edge_', '') for col in edge_prop_cols]
-        end_props = [col.replace('end_', '') for col in end_prop_cols]
-        
-        # Load using CSVFreighter
-        print(f"\n  Loading {csv_filename}...")
-        
-        await instance.load(
-            graph_name=graph_name,
-            start_v_label=start_label,
-            start_id='start_id',
-            start_props=start_props,
-            edge_type=edge_label,
-            edge_props=edge_props_list,
-            end_v_label=end_label,
-            end_id='end_id',
-            end_props=end_props,
-            csv_path=csv_filename,
-            use_copy=True,
-            drop_graph=drop_graph,  # Only drop on first iteration
-            create_graph=(drop_graph or edge_label == edges_df['edge_label'].unique()[0]),  # Create if first
-            progress=True,
-        )
-        
-        # After first load, don't drop or create graph anymore
-        drop_graph = False
-        
-        print(f"  ✓ Loaded {edge_label} edges")
-    
+    nodes_df = read_csv_fast('nodes.csv')
+    nodes_df['label'] = nodes_df['label'].astype('category')
+
+    # Parse the node properties column once instead of once per edge
+    nodes_df['properties'] = nodes_df['properties'].map(_parse_props)
+
+    # Flatten node properties once per vertex label and reuse the result
+    # across every edge label that touches it; this also keeps each
+    # combined CSV free of other labels' property columns
+    node_props_by_label = {}
+    for label, group in nodes_df.groupby('label', observed=True):
+        props = pd.json_normalize(list(group['properties']))
+        props.index = group['id']
+        node_props_by_label[label] = props
+    node_labels = pd.Series(nodes_df['label'].values, index=nodes_df['id'].values)
+
+    # Stream edges.csv in chunks, splitting rows into per-label groups as
+    # they arrive, so the whole file and the per-label copies never
+    # coexist in memory. Category dtype keeps the label column as
+    # integer codes instead of repeated strings.
+    label_chunks = {}
+    for chunk in pd.read_csv('edges.csv', chunksize=CSV_CHUNK_ROWS,
+                             dtype={'from_id': 'int64', 'to_id': 'int64',
+                                    'edge_label': 'category'}):
+        chunk['properties'] = chunk['properties'].map(_parse_props)
+        for edge_label, group in chunk.groupby('edge_label', observed=True):
+            label_chunks.setdefault(edge_label, []).append(group)
+
+    label_groups = [(edge_label, pd.concat(chunks, ignore_index=True))
+                    for edge_label, chunks in label_chunks.items()]
+    total_edges = sum(len(group) for _, group in label_groups)
+
+    print(f"Found {len(nodes_df):,} nodes and {total_edges:,} edges")
+
+    # Pipeline CSV preparation (CPU-bound pandas work) with loading
+    # (I/O-bound COPY): the next label's CSV is prepared in a worker
+    # thread while the previous one streams into the database.
+    prepared_queue = asyncio.Queue(maxsize=2)
+
+    async def prepare_all():
+        for edge_label, label_edges in label_groups:
+            prepared = await asyncio.to_thread(
+                prepare_label_csv, edge_label, label_edges,
+                node_props_by_label, node_labels)
+            await prepared_queue.put(prepared)
+        await prepared_queue.put(None)
+
+    async def load_all():
+        nonlocal drop_graph
+        first_label = True
+        while True:
+            prepared = await prepared_queue.get()
+            if prepared is None:
+                break
+
+            print(f"\n  Loading {prepared['csv_filename']}...")
+
+            await instance.load(
+                graph_name=graph_name,
+                start_v_label=prepared['start_label'],
+                start_id='start_id',
+                start_props=prepared['start_props'],
+                edge_type=prepared['edge_label'],
+                edge_props=prepared['edge_props'],
+                end_v_label=prepared['end_label'],
+                end_id='end_id',
+                end_props=prepared['end_props'],
+                csv_path=prepared['csv_filename'],
+                use_copy=True,
+                drop_graph=drop_graph,  # Only drop on first iteration
+                create_graph=(drop_graph or first_label),  # Create if first
+                progress=True,
+            )
+
+            # After first load, don't drop or create graph anymore
+            drop_graph = False
+            first_label = False
+
+            print(f"  ✓ Loaded {prepared['edge_label']} edges")
+
+    if defer_indexes:
+        # Drop the graph's secondary indexes for the duration of the
+        # load and rebuild them once at the end
+        with get_connection() as index_conn:
+            index_cur = index_conn.cursor()
+            index_defs = drop_graph_indexes(index_cur, graph_name)
+            index_conn.commit()
+            try:
+                await asyncio.gather(prepare_all(), load_all())
+            finally:
+                rebuild_graph_indexes(index_cur, index_defs)
+                index_conn.commit()
+                index_cur.close()
+    else:
+        await asyncio.gather(prepare_all(), load_all())
+
     print("\n" + "="*70)
     print("LOADING COMPLETE")
     print("="*70)
     print(f"Total nodes: {len(nodes_df):,}")
-    print(f"Total edges: {len(edges_df):,}")
+    print(f"Total edges: {total_edges:,}")
     print("="*70 + "\n")
 
 async def main():
@@ -161,6 +404,14 @@ async def main():
                        help='Name of the graph')
     parser.add_argument('--drop-graph', action='store_true',
                        help='Drop existing graph before loading')
+    parser.add_argument('--pool-min', type=int, default=None,
+                       help='Minimum pool connections (default: min(cpu_count, 25))')
+    parser.add_argument('--pool-max', type=int, default=None,
+                       help='Maximum pool connections (default: 2 * cpu_count)')
+    parser.add_argument('--fast-ingest', action='store_true',
+                       help='Bypass CSVFreighter and COPY straight into the AGE label tables')
+    parser.add_argument('--defer-indexes', action='store_true',
+                       help='Drop secondary indexes during load and rebuild afterward')
     
     args = parser.parse_args()
     
@@ -175,7 +426,12 @@ async def main():
         print("Generate data first with generate_edges.py")
         return
     
-    await load_with_csvfreighter(args.graph_name, args.drop_graph)
+    if args.fast_ingest:
+        fast_ingest(args.graph_name)
+    else:
+        await load_with_csvfreighter(args.graph_name, args.drop_graph,
+                                     args.pool_min, args.pool_max,
+                                     args.defer_indexes)
     
     print("\n✓ Success! Run 'python quick_check.py' to verify.")
 
@@ -0,0 +1,362 @@
+# agload_loader.py
+"""
+Loader that stages per-label CSVs and ingests them with the AGLoad
+bulk-import tool (build-from-source; see AGEFREIGHTER_GUIDE.md).
+"""
+
+import ast
+import concurrent.futures
+import csv
+import json
+import os
+import subprocess
+
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # optional fast path; stdlib json is the fallback
+    orjson = None
+
+from config import DB_CONFIG, GRAPH_NAME
+from db_connection import create_graph
+
+AGE_LOAD_BIN = 'age_load'
+
+def _dumps(obj):
+    """Serialize one properties dict to JSON, via orjson when present."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+def _loads_cell(text):
+    """Parse one properties cell: JSON, or a legacy dict repr."""
+    try:
+        return orjson.loads(text) if orjson is not None else json.loads(text)
+    except ValueError:
+        return ast.literal_eval(text)
+
+def _parse_properties(series):
+    """Parse a serialized properties column from the generators."""
+    if len(series) and isinstance(series.iat[0], str):
+        return series.map(_loads_cell)
+    return series
+
+def prepare_vertex_csv(nodes_df, output_dir='.', fmt='csv', properties_column=False):
+    """
+    Write one file per vertex label for AGLoad.
+
+    fmt='csv' (what age_load consumes) streams through csv.writer;
+    fmt='parquet' writes zstd-compressed Parquet for stages that can
+    ingest binary columnar input directly. properties_column=True emits
+    AGLoad's native id,properties layout with one JSON cell per row
+    instead of one column per property.
+
+    Returns:
+        dict of {label: (path, n_rows)}
+    """
+    files = {}
+    props = _parse_properties(nodes_df['properties'])
+
+    # One groupby pass instead of a full boolean scan per label
+    # Groups are only read, never mutated, so no defensive copy
+    for label, label_df in nodes_df.groupby('label', sort=False):
+
+        if properties_column:
+            # Single JSON column: fewer bytes on the wire (no repeated
+            # header-per-property) and AGE skips per-column type coercion
+            path = os.path.join(output_dir, f'vertices_{label}.csv')
+            with open(path, 'w', newline='', buffering=1 << 20) as fh:
+                writer = csv.writer(fh, quoting=csv.QUOTE_MINIMAL)
+                writer.writerow(['id', 'properties'])
+                writer.writerows(zip(label_df['id'].to_numpy(),
+                                     props.loc[label_df.index].map(_dumps)))
+            files[label] = (path, len(label_df))
+            print(f"  Prepared {path}")
+            continue
+
+        # Properties expand to columns in one vectorized pass; no
+        # per-row iterrows/dict assembly
+        prop_df = pd.json_normalize(props.loc[label_df.index].tolist())
+
+        if fmt == 'parquet':
+            path = os.path.join(output_dir, f'vertices_{label}.parquet')
+            out = pd.concat([label_df[['id']].reset_index(drop=True), prop_df], axis=1)
+            out.to_parquet(path, engine='pyarrow', compression='zstd')
+        else:
+            # Stream straight from the column arrays with csv.writer — one
+            # pass, no intermediate combined DataFrame or to_csv string build
+            path = os.path.join(output_dir, f'vertices_{label}.csv')
+            with open(path, 'w', newline='', buffering=1 << 20) as fh:
+                writer = csv.writer(fh, quoting=csv.QUOTE_MINIMAL)
+                writer.writerow(['id', *prop_df.columns])
+                writer.writerows(zip(label_df['id'].to_numpy(),
+                                     *(prop_df[c].to_numpy() for c in prop_df.columns)))
+        files[label] = (path, len(label_df))
+        print(f"  Prepared {path}")
+
+    return files
+
+def prepare_edge_csv(edges_df, output_dir='.', fmt='csv', properties_column=False):
+    """
+    Write one file per edge label with start_id/end_id plus properties.
+
+    Same fmt and properties_column choices as prepare_vertex_csv.
+
+    Returns:
+        dict of {edge_label: (path, n_rows)}
+    """
+    files = {}
+    props = _parse_properties(edges_df['properties'])
+
+    for edge_label, label_df in edges_df.groupby('edge_label', sort=False):
+
+        if properties_column:
+            path = os.path.join(output_dir, f'edges_{edge_label}.csv')
+            with open(path, 'w', newline='', buffering=1 << 20) as fh:
+                writer = csv.writer(fh, quoting=csv.QUOTE_MINIMAL)
+                writer.writerow(['start_id', 'end_id', 'properties'])
+                writer.writerows(zip(label_df['from_id'].to_numpy(),
+                                     label_df['to_id'].to_numpy(),
+                                     props.loc[label_df.index].map(_dumps)))
+            files[edge_label] = (path, len(label_df))
+            print(f"  Prepared {path}")
+            continue
+
+        prop_df = pd.json_normalize(props.loc[label_df.index].tolist())
+        endpoints = (label_df[['from_id', 'to_id']]
+                     .rename(columns={'from_id': 'start_id', 'to_id': 'end_id'})
+                     .reset_index(drop=True))
+
+        if fmt == 'parquet':
+            path = os.path.join(output_dir, f'edges_{edge_label}.parquet')
+            out = pd.concat([endpoints, prop_df], axis=1)
+            out.to_parquet(path, engine='pyarrow', compression='zstd')
+        else:
+            path = os.path.join(output_dir, f'edges_{edge_label}.csv')
+            with open(path, 'w', newline='', buffering=1 << 20) as fh:
+                writer = csv.writer(fh, quoting=csv.QUOTE_MINIMAL)
+                writer.writerow(['start_id', 'end_id', *prop_df.columns])
+                writer.writerows(zip(endpoints['start_id'].to_numpy(),
+                                     endpoints['end_id'].to_numpy(),
+                                     *(prop_df[c].to_numpy() for c in prop_df.columns)))
+        files[edge_label] = (path, len(label_df))
+        print(f"  Prepared {path}")
+
+    return files
+
+def _age_load_cmd(graph_name, label, csv_path, kind, properties_column=False):
+    """Build the age_load argv for one label's CSV."""
+    cmd = [
+        AGE_LOAD_BIN,
+        '--host', DB_CONFIG['host'],
+        '--port', str(DB_CONFIG['port']),
+        '--dbname', DB_CONFIG['database'],
+        '--user', DB_CONFIG['user'],
+        '--graph', graph_name,
+        '--vertex' if kind == 'v' else '--edge', label,
+        '--csv-path', csv_path,
+    ]
+    if properties_column:
+        cmd.append('--properties-column')
+    return cmd
+
+def load_with_agload(vertex_files, edge_files, graph_name=GRAPH_NAME,
+                     properties_column=False):
+    """
+    Run age_load per staged CSV: all vertex labels in parallel, then all
+    edge labels in parallel.
+
+    Per-label loads are independent within a stage, and subprocess.wait
+    releases the GIL, so threads give near-linear overlap. Edges still
+    wait for every vertex label to finish since they reference vertex
+    ids. Failures are aggregated and reported after the stage instead of
+    interleaving prints with the loads.
+    """
+    env = dict(os.environ, PGPASSWORD=DB_CONFIG['password'])
+
+    def run_one(label, csv_file, kind):
+        # Loader progress output goes straight to /dev/null instead of
+        # being buffered and decoded in Python; stderr is kept as bytes
+        # and only decoded on failure
+        result = subprocess.run(
+            _age_load_cmd(graph_name, label, csv_file, kind, properties_column),
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, env=env)
+        return label, result.returncode, result.stderr
+
+    def run_stage(files, kind):
+        total = 0
+        failures = []
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(len(files), os.cpu_count())) as executor:
+            futures = [executor.submit(run_one, label, path, kind)
+                       for label, (path, _) in files.items()]
+            for future in concurrent.futures.as_completed(futures):
+                label, returncode, stderr = future.result()
+                if returncode != 0:
+                    failures.append((label, stderr))
+                else:
+                    # Row counts were recorded at write time; no need to
+                    # reopen the CSV just to count lines
+                    total += files[label][1]
+                    print(f"  ✓ Loaded {label}")
+        for label, stderr in failures:
+            print(f"✗ age_load failed for {label}: {stderr.decode(errors='replace')}")
+        if failures:
+            raise RuntimeError(f"age_load failed for {len(failures)} label(s)")
+        return total
+
+    total_vertices = run_stage(vertex_files, 'v') if vertex_files else 0
+    total_edges = run_stage(edge_files, 'e') if edge_files else 0
+
+    print(f"✓ Loaded {total_vertices} vertices and {total_edges} edges")
+
+def load_with_agload_manifest(vertex_files, edge_files, graph_name=GRAPH_NAME,
+                              properties_column=False,
+                              manifest_path='agload_manifest.json'):
+    """
+    Run one age_load invocation over a manifest of every staged file.
+
+    A single process amortizes startup, connection setup, and catalog
+    lookups across all labels. If the installed age_load does not accept
+    --manifest, falls back to the per-label invocations.
+    """
+    entries = (
+        [{'label': label, 'type': 'vertex', 'csv_path': path}
+         for label, (path, _) in vertex_files.items()]
+        + [{'label': label, 'type': 'edge', 'csv_path': path}
+           for label, (path, _) in edge_files.items()]
+    )
+    with open(manifest_path, 'w') as fh:
+        json.dump(entries, fh)
+
+    cmd = [
+        AGE_LOAD_BIN,
+        '--host', DB_CONFIG['host'],
+        '--port', str(DB_CONFIG['port']),
+        '--dbname', DB_CONFIG['database'],
+        '--user', DB_CONFIG['user'],
+        '--graph', graph_name,
+        '--manifest', manifest_path,
+    ]
+    if properties_column:
+        cmd.append('--properties-column')
+
+    env = dict(os.environ, PGPASSWORD=DB_CONFIG['password'])
+    result = subprocess.run(cmd, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, env=env)
+    if result.returncode != 0:
+        print("age_load --manifest not usable "
+              f"({result.stderr.decode(errors='replace').strip()}); "
+              "falling back to per-label invocations")
+        return load_with_agload(vertex_files, edge_files, graph_name,
+                                properties_column)
+
+    total_vertices = sum(rows for _, rows in vertex_files.values())
+    total_edges = sum(rows for _, rows in edge_files.values())
+    print(f"✓ Loaded {total_vertices} vertices and {total_edges} edges (one invocation)")
+
+def _stream_group(cmd, env, header, rows):
+    """Pipe one label's CSV rows into an age_load process over stdin."""
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, text=True, env=env)
+    try:
+        writer = csv.writer(proc.stdin)
+        writer.writerow(header)
+        count = 0
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    finally:
+        proc.stdin.close()
+    if proc.wait() != 0:
+        raise RuntimeError(f"age_load failed for streamed load: {cmd}")
+    return count
+
+def stream_with_agload(nodes_df, edges_df, graph_name=GRAPH_NAME):
+    """
+    Pipe per-label CSV bytes straight into age_load over stdin ('-').
+
+    Skips the disk staging round-trip entirely, and rows are counted as
+    they are written, so nothing is reopened just for a line count.
+    """
+    create_graph(graph_name)
+    env = dict(os.environ, PGPASSWORD=DB_CONFIG['password'])
+    total_vertices = 0
+    total_edges = 0
+
+    node_props = _parse_properties(nodes_df['properties'])
+    for label, label_df in nodes_df.groupby('label', sort=False):
+        prop_df = pd.json_normalize(node_props.loc[label_df.index].tolist())
+        total_vertices += _stream_group(
+            _age_load_cmd(graph_name, label, '-', 'v'), env,
+            ['id', *prop_df.columns],
+            zip(label_df['id'].to_numpy(),
+                *(prop_df[c].to_numpy() for c in prop_df.columns)))
+        print(f"  ✓ Streamed {label} vertices")
+
+    edge_props = _parse_properties(edges_df['properties'])
+    for edge_label, label_df in edges_df.groupby('edge_label', sort=False):
+        prop_df = pd.json_normalize(edge_props.loc[label_df.index].tolist())
+        total_edges += _stream_group(
+            _age_load_cmd(graph_name, edge_label, '-', 'e'), env,
+            ['start_id', 'end_id', *prop_df.columns],
+            zip(label_df['from_id'].to_numpy(), label_df['to_id'].to_numpy(),
+                *(prop_df[c].to_numpy() for c in prop_df.columns)))
+        print(f"  ✓ Streamed {edge_label} edges")
+
+    print(f"✓ Streamed {total_vertices} vertices and {total_edges} edges")
+
+def load_with_agload_from_dataframes(nodes_df, edges_df, graph_name=GRAPH_NAME,
+                                     output_dir='.', stream=False,
+                                     properties_column=False, manifest=False):
+    """Stage per-label CSVs from in-memory frames and run age_load."""
+    if stream:
+        return stream_with_agload(nodes_df, edges_df, graph_name)
+
+    create_graph(graph_name)
+
+    print("Preparing vertex CSVs...")
+    vertex_files = prepare_vertex_csv(nodes_df, output_dir,
+                                      properties_column=properties_column)
+    print("Preparing edge CSVs...")
+    edge_files = prepare_edge_csv(edges_df, output_dir,
+                                  properties_column=properties_column)
+
+    if manifest:
+        load_with_agload_manifest(vertex_files, edge_files, graph_name,
+                                  properties_column=properties_column)
+    else:
+        load_with_agload(vertex_files, edge_files, graph_name,
+                         properties_column=properties_column)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Load CSV data into AGE via age_load')
+    parser.add_argument('--graph-name', type=str, default=GRAPH_NAME,
+                       help='Name of the graph (default: generated_graph)')
+    parser.add_argument('--stream', action='store_true',
+                       help='Pipe CSV rows into age_load over stdin instead of staging files')
+    parser.add_argument('--properties-column', action='store_true',
+                       help="Stage AGLoad's native single-JSON-properties-column layout")
+    parser.add_argument('--manifest', action='store_true',
+                       help='Load every staged file with one age_load --manifest invocation')
+    parser.add_argument('--direct', action='store_true',
+                       help='COPY into the label tables over one connection instead of running age_load')
+
+    args = parser.parse_args()
+
+    if args.direct:
+        # Single-connection COPY into the label tables: no age_load
+        # subprocess startup, fresh connection, or catalog lookup per
+        # label. The freighter module already implements this path.
+        from Csvfreighter_loader import fast_ingest
+        fast_ingest(args.graph_name)
+    else:
+        nodes_df = pd.read_csv('nodes.csv')
+        edges_df = pd.read_csv('edges.csv')
+
+        load_with_agload_from_dataframes(nodes_df, edges_df, args.graph_name,
+                                         stream=args.stream,
+                                         properties_column=args.properties_column,
+                                         manifest=args.manifest)
@@ -0,0 +1,209 @@
+# benchmark_queries.py
+"""
+Benchmark script for query shapes beyond the plain hop traversals in
+benchmark_hops.py, currently the 1..2 variable-length neighborhood.
+"""
+
+import concurrent.futures
+import json
+import threading
+import time
+
+import numpy as np
+
+from benchmark_hops import benchmark_connection
+from config import GRAPH_NAME
+from db_connection import ensure_id_indexes
+
+def run_timed_query(cur, query, params=None, batch_size=10000):
+    """Execute a query and return (elapsed_ms, row_count)."""
+    # perf_counter_ns is monotonic with ns resolution; time.time() is
+    # wall-clock and too coarse for sub-millisecond queries
+    start_ns = time.perf_counter_ns()
+    cur.execute(query, params)
+    # Drain in fixed-size batches: memory stays capped at batch_size rows
+    # and the timing is not dominated by building one giant result list
+    row_count = 0
+    while True:
+        batch = cur.fetchmany(batch_size)
+        if not batch:
+            break
+        row_count += len(batch)
+    elapsed_ms = (time.perf_counter_ns() - start_ns) / 1e6
+    return elapsed_ms, row_count
+
+def benchmark_query(cur, graph_name, cypher_body, iterations=10, node_id=None):
+    """
+    Benchmark one Cypher query body with PREPARE/EXECUTE.
+
+    The statement is prepared once so the server parses and plans a
+    single time; the timing loop then only pays execution + fetch, all
+    inside one transaction. node_id, when given, is bound through
+    cypher()'s agtype parameter argument as $node_id.
+    """
+    if node_id is not None:
+        cur.execute(f"""
+        PREPARE bench(agtype) AS
+        SELECT * FROM cypher('{graph_name}', $$
+            {cypher_body}
+        $$, $1) as (result agtype);
+        """)
+        execute_sql = "EXECUTE bench(%s);"
+        params = (json.dumps({'node_id': node_id}),)
+    else:
+        cur.execute(f"""
+        PREPARE bench AS
+        SELECT * FROM cypher('{graph_name}', $$
+            {cypher_body}
+        $$) as (result agtype);
+        """)
+        execute_sql = "EXECUTE bench;"
+        params = None
+
+    times = []
+    result_counts = []
+
+    try:
+        for i in range(iterations):
+            elapsed_ms, count = run_timed_query(cur, execute_sql, params)
+            times.append(elapsed_ms)
+            result_counts.append(count)
+    finally:
+        cur.execute("DEALLOCATE bench;")
+
+    # One C-level pass over the samples instead of five Python ones; the
+    # percentiles are what latency SLOs are usually stated in
+    t = np.asarray(times, dtype=np.float64)
+    return {
+        'min_ms': float(t.min()),
+        'max_ms': float(t.max()),
+        'mean_ms': float(t.mean()),
+        'median_ms': float(np.median(t)),
+        'p95_ms': float(np.percentile(t, 95)),
+        'p99_ms': float(np.percentile(t, 99)),
+        'stdev_ms': float(t.std(ddof=1)) if t.size > 1 else 0.0,
+        'result_count': result_counts[0],  # Should be same for all iterations
+    }
+
+def find_nodes_within_distance_2(graph_name=GRAPH_NAME, node_id=1, iterations=10, cur=None):
+    """Benchmark the 1..2 variable-length neighborhood of a node."""
+    if cur is None:
+        with benchmark_connection() as shared_cur:
+            return find_nodes_within_distance_2(graph_name, node_id, iterations, shared_cur)
+
+    cypher_body = """MATCH (start {id: $node_id})-[*1..2]-(connected)
+            RETURN DISTINCT connected.id"""
+    return benchmark_query(cur, graph_name, cypher_body, iterations, node_id=node_id)
+
+# Sampled ids keyed on (graph_name, count); the sample is deterministic
+# for a given graph, so repeat calls in multi-run harnesses can skip the
+# round-trip entirely
+_sample_ids_cache = {}
+
+def get_sample_node_ids(graph_name=GRAPH_NAME, count=5, cur=None, refresh=False):
+    """Get sample node IDs from the graph.
+
+    Results are cached per process; pass refresh=True after reloading
+    the graph to force a new sample.
+    """
+    cache_key = (graph_name, count)
+    if not refresh and cache_key in _sample_ids_cache:
+        return _sample_ids_cache[cache_key]
+
+    if cur is None:
+        with benchmark_connection() as shared_cur:
+            return get_sample_node_ids(graph_name, count, shared_cur, refresh)
+
+    # The row limit is bound as a SQL %s parameter on the outer query, so
+    # every call shares one statement; graph_name stays interpolated
+    # because cypher() only accepts a literal graph name
+    cur.execute(f"""
+    SELECT * FROM cypher('{graph_name}', $$
+        MATCH (n)
+        RETURN n.id as id
+    $$) as (id agtype)
+    LIMIT %s;
+    """, (count,))
+    node_ids = [int(str(row[0]).strip('"')) for row in cur.fetchmany(count)]
+    _sample_ids_cache[cache_key] = node_ids
+    return node_ids
+
+def benchmark_multiple_nodes(graph_name=GRAPH_NAME, iterations=10, num_nodes=5,
+                             parallel=False):
+    """Run the distance-2 benchmark for several sample nodes.
+
+    With parallel=True each node's benchmark runs on its own pooled
+    connection in a thread pool; serial stays the default so single-node
+    timings are not contaminated by contention.
+    """
+    print("="*70)
+    print("DISTANCE-2 NEIGHBORHOOD BENCHMARK")
+    print("="*70)
+    print(f"\nGraph: {graph_name}")
+    print(f"Iterations per node: {iterations}")
+    if parallel:
+        print("Mode: parallel (one pooled connection per node)")
+
+    # Indexed lookups on id are what we mean to measure, not the seq
+    # scan an unindexed MATCH (start {id: ...}) would fall back to
+    ensure_id_indexes(graph_name)
+
+    with benchmark_connection() as cur:
+        node_ids = get_sample_node_ids(graph_name, num_nodes, cur)
+    print(f"Testing with nodes: {node_ids}")
+
+    print_lock = threading.Lock()
+
+    def benchmark_node(node_id):
+        # cur=None makes find_nodes_within_distance_2 check out its own
+        # pooled connection, so threads never share a cursor
+        stats = find_nodes_within_distance_2(graph_name, node_id, iterations)
+        with print_lock:
+            print(f"\nNode {node_id}:")
+            print(f"  Results: {stats['result_count']} nodes")
+            print(f"  Mean: {stats['mean_ms']:.2f}ms | Median: {stats['median_ms']:.2f}ms | "
+                  f"Std Dev: {stats['stdev_ms']:.2f}ms")
+            print(f"  P95: {stats['p95_ms']:.2f}ms | P99: {stats['p99_ms']:.2f}ms")
+        return stats
+
+    if parallel:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(node_ids), 8)) as executor:
+            all_stats = list(executor.map(benchmark_node, node_ids))
+    else:
+        all_stats = [benchmark_node(node_id) for node_id in node_ids]
+
+    if all_stats:
+        means = np.asarray([s['mean_ms'] for s in all_stats])
+        print(f"\nOverall mean across nodes: {means.mean():.2f}ms "
+              f"(p95 of per-node means: {np.percentile(means, 95):.2f}ms)")
+    print()
+    return all_stats
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark distance-2 neighborhood queries')
+    parser.add_argument('--graph-name', type=str, default=GRAPH_NAME,
+                       help='Name of the graph (default: generated_graph)')
+    parser.add_argument('--iterations', type=int, default=10,
+                       help='Number of iterations per query (default: 10)')
+    parser.add_argument('--num-nodes', type=int, default=5,
+                       help='Number of sample nodes to test (default: 5)')
+    parser.add_argument('--node-id', type=int, default=None,
+                       help='Test specific node ID instead of sampled nodes')
+    parser.add_argument('--parallel', action='store_true',
+                       help='Benchmark sampled nodes concurrently on pooled connections')
+
+    args = parser.parse_args()
+
+    if args.node_id:
+        stats = find_nodes_within_distance_2(args.graph_name, args.node_id, args.iterations)
+        print(f"Node {args.node_id}:")
+        print(f"  Results: {stats['result_count']} nodes")
+        print(f"  Min: {stats['min_ms']:.2f}ms | Max: {stats['max_ms']:.2f}ms")
+        print(f"  Mean: {stats['mean_ms']:.2f}ms | Median: {stats['median_ms']:.2f}ms | "
+              f"Std Dev: {stats['stdev_ms']:.2f}ms")
+        print(f"  P95: {stats['p95_ms']:.2f}ms | P99: {stats['p99_ms']:.2f}ms")
+    else:
+        benchmark_multiple_nodes(args.graph_name, args.iterations, args.num_nodes,
+                                 parallel=args.parallel)
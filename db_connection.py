@@ -1,48 +1,138 @@
 # db_connection.py
+import atexit
+import contextlib
+import weakref
 import psycopg2
+from psycopg2 import pool
 from config import DB_CONFIG, GRAPH_NAME
 
-def get_connection():
-    """Create and return a database connection."""
-    conn = psycopg2.connect(**DB_CONFIG)
-    return conn
+# Shared connection pool: a checkout costs microseconds versus the
+# tens of milliseconds a fresh TCP+auth handshake takes per call
+_pool = None
 
-def setup_age_environment():
-    """Load AGE extension and set search path."""
-    conn = get_connection()
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = pool.ThreadedConnectionPool(minconn=2, maxconn=16, **DB_CONFIG)
+        atexit.register(_pool.closeall)
+    return _pool
+
+# Pooled connections that already ran the AGE prelude. Weak references:
+# putconn closes connections beyond minconn, and a set of id()s would
+# alias a freed connection with whatever psycopg2.connect allocates at
+# the same address next — silently skipping the prelude on it
+_initialized_connections = weakref.WeakSet()
+
+def _setup_connection(conn):
+    """Run the AGE session prelude once per physical connection."""
+    if conn in _initialized_connections:
+        return
     cur = conn.cursor()
     try:
         cur.execute("LOAD 'age';")
         cur.execute("SET search_path = ag_catalog, '$user', public;")
         conn.commit()
-        print("AGE environment configured successfully")
-    except Exception as e:
-        print(f"Error setting up AGE: {e}")
-        raise
     finally:
         cur.close()
-        conn.close()
+    _initialized_connections.add(conn)
 
-def create_graph(graph_name=GRAPH_NAME):
-    """Create a graph in AGE."""
-    conn = get_connection()
-    cur = conn.cursor()
+def reset_pool():
+    """Forget the inherited pool in a forked worker process.
+
+    A child forked after the parent built the pool inherits the same
+    sockets in its copied free-list; two processes checking the same
+    connection out would interleave bytes on one socket, and the
+    worker's cleanup would close sockets the parent still uses. Run
+    this as a process pool's initializer so each worker lazily builds
+    its own pool instead.
+    """
+    global _pool
+    _pool = None
+    _initialized_connections.clear()
+
+@contextlib.contextmanager
+def get_connection():
+    """Check a pooled connection out for the duration of a with block.
+
+    The LOAD 'age' / search_path prelude is applied (and committed) the
+    first time each physical connection is checked out, so callers never
+    need to re-run it.
+    """
+    connection_pool = _get_pool()
+    conn = connection_pool.getconn()
     try:
-        cur.execute("LOAD 'age';")
-        cur.execute("SET search_path = ag_catalog, '$user', public;")
-        
-        # Check if graph exists
-        cur.execute(f"SELECT * FROM ag_catalog.ag_graph WHERE name = '{graph_name}';")
-        if cur.fetchone():
-            print(f"Graph '{graph_name}' already exists")
-        else:
-            cur.execute(f"SELECT create_graph('{graph_name}');")
-            conn.commit()
-            print(f"Graph '{graph_name}' created successfully")
-    except Exception as e:
-        conn.rollback()
-        print(f"Error creating graph: {e}")
-        raise
+        _setup_connection(conn)
+        yield conn
     finally:
-        cur.close()
-        conn.close()
+        connection_pool.putconn(conn)
+
+def setup_age_environment():
+    """Load AGE extension and set search path."""
+    with get_connection() as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute("LOAD 'age';")
+            cur.execute("SET search_path = ag_catalog, '$user', public;")
+            conn.commit()
+            print("AGE environment configured successfully")
+        except Exception as e:
+            print(f"Error setting up AGE: {e}")
+            raise
+        finally:
+            cur.close()
+
+def ensure_id_indexes(graph_name=GRAPH_NAME, analyze=True):
+    """Create btree indexes on properties 'id' for every vertex label.
+
+    Without them, resolving MATCH (n {id: ...}) seq-scans the whole
+    label table, which easily dominates traversal benchmarks. ANALYZE
+    runs afterwards so the planner actually picks the new indexes.
+    """
+    with get_connection() as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute("""
+                SELECT name FROM ag_catalog.ag_label
+                WHERE kind = 'v'
+                AND graph = (SELECT graphid FROM ag_catalog.ag_graph WHERE name = %s);
+            """, (graph_name,))
+            labels = [row[0] for row in cur.fetchall()]
+            # Same name and expression as load_to_age's create_indexes /
+            # drop_indexes, so the bulk loaders' drop-before-load logic
+            # covers indexes built here too
+            for label in labels:
+                cur.execute(f'''
+                    CREATE INDEX IF NOT EXISTS "{label}_id_idx"
+                    ON "{graph_name}"."{label}"
+                    (ag_catalog.agtype_access_operator(properties, '"id"'::agtype));
+                ''')
+                if analyze:
+                    cur.execute(f'ANALYZE "{graph_name}"."{label}";')
+            conn.commit()
+            print(f"✓ Ensured id indexes on {len(labels)} vertex labels")
+        except Exception as e:
+            conn.rollback()
+            print(f"Error creating id indexes: {e}")
+            raise
+        finally:
+            cur.close()
+
+def create_graph(graph_name=GRAPH_NAME):
+    """Create a graph in AGE."""
+    with get_connection() as conn:
+        cur = conn.cursor()
+        try:
+            # Check if graph exists
+            cur.execute(f"SELECT * FROM ag_catalog.ag_graph WHERE name = '{graph_name}';")
+            if cur.fetchone():
+                print(f"Graph '{graph_name}' already exists")
+            else:
+                cur.execute(f"SELECT create_graph('{graph_name}');")
+                conn.commit()
+                print(f"Graph '{graph_name}' created successfully")
+        except Exception as e:
+            conn.rollback()
+            print(f"Error creating graph: {e}")
+            raise
+        finally:
+            cur.close()
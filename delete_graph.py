@@ -0,0 +1,109 @@
+# delete_graph.py
+"""Utilities for clearing or dropping an Apache AGE graph."""
+
+from db_connection import get_connection
+from config import GRAPH_NAME
+
+def delete_all_data(graph_name=GRAPH_NAME, batch_size=10000):
+    """
+    Delete all nodes and edges from the graph.
+
+    The batch loop runs entirely server-side in a PL/pgSQL DO block, so
+    a full wipe costs one round-trip and one commit instead of one of
+    each per batch.
+    """
+    with get_connection() as conn:
+        cur = conn.cursor()
+        try:
+            print(f"Deleting all data from graph '{graph_name}'...")
+            # DO blocks cannot take bind parameters, so the batch size is
+            # coerced to int before being spliced into the block
+            batch_size = int(batch_size)
+            cur.execute(f"""
+            DO $do$
+            DECLARE
+                deleted bigint;
+            BEGIN
+                LOOP
+                    SELECT count(*) INTO deleted
+                    FROM ag_catalog.cypher('{graph_name}', $$
+                        MATCH (n)
+                        WITH n LIMIT {batch_size}
+                        DETACH DELETE n
+                        RETURN 1
+                    $$) as (r ag_catalog.agtype);
+                    EXIT WHEN deleted = 0;
+                END LOOP;
+            END
+            $do$;
+            """)
+            conn.commit()
+            print("✓ All data deleted")
+        except Exception as e:
+            conn.rollback()
+            print(f"✗ Error deleting data: {e}")
+            raise
+        finally:
+            cur.close()
+
+def drop_graph(graph_name=GRAPH_NAME):
+    """Drop the graph and all of its data."""
+    with get_connection() as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute(f"SELECT drop_graph('{graph_name}', true);")
+            conn.commit()
+            print(f"✓ Graph '{graph_name}' dropped")
+        except Exception as e:
+            conn.rollback()
+            print(f"✗ Error dropping graph: {e}")
+            raise
+        finally:
+            cur.close()
+
+def verify_empty(graph_name=GRAPH_NAME):
+    """Check that the graph contains no nodes or edges."""
+    with get_connection() as conn:
+        cur = conn.cursor()
+        try:
+            # Both counts ride in one statement (two scalar subqueries),
+            # so verification costs a single round-trip
+            cur.execute(f"""
+                SELECT
+                    (SELECT cnt FROM cypher('{graph_name}', $$
+                        MATCH (n) RETURN count(n)
+                    $$) as (cnt agtype)),
+                    (SELECT cnt FROM cypher('{graph_name}', $$
+                        MATCH ()-[r]->() RETURN count(r)
+                    $$) as (cnt agtype));
+            """)
+            row = cur.fetchone()
+            node_count, edge_count = int(str(row[0])), int(str(row[1]))
+
+            print(f"Nodes: {node_count}, Edges: {edge_count}")
+            if node_count == 0 and edge_count == 0:
+                print("✓ Graph is empty")
+                return True
+            print("⚠ Graph still contains data")
+            return False
+        finally:
+            cur.close()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Clear or drop an AGE graph')
+    parser.add_argument('--graph-name', type=str, default=GRAPH_NAME,
+                       help='Name of the graph (default: generated_graph)')
+    parser.add_argument('--batch-size', type=int, default=10000,
+                       help='Server-side delete batch size (default: 10000)')
+    parser.add_argument('--drop', action='store_true',
+                       help='Drop the whole graph instead of just clearing data')
+
+    args = parser.parse_args()
+
+    if args.drop:
+        drop_graph(args.graph_name)
+    else:
+        delete_all_data(args.graph_name, args.batch_size)
+        verify_empty(args.graph_name)
@@ -1,49 +1,154 @@
 # generate_nodes.py
+import concurrent.futures
+import json
+import os
+
+import numpy as np
 import pandas as pd
 import random
 from datetime import datetime, timedelta
 
-def generate_nodes(node_types, num_nodes_per_type):
+def _generate_label(label, count, id_start, seed):
+    """Generate one label's nodes; runs in a worker process."""
+    rng = np.random.default_rng(seed)
+    prop_df = pd.DataFrame(node_types_batch[label](count, rng))
+    return pd.DataFrame({
+        'id': np.arange(id_start, id_start + count),
+        'label': label,
+        'properties': prop_df.to_dict(orient='records'),
+    })
+
+# Low-cardinality string properties that become pandas Categoricals in
+# the wide output layout
+_LOW_CARDINALITY_COLUMNS = {'industry', 'category', 'country'}
+
+def generate_nodes(node_types, num_nodes_per_type, rng=None, parallel=False,
+                   wide=False):
     """
     Generate nodes with different types and properties.
-    
+
+    Labels with a batched generator in node_types_batch are produced
+    column-at-a-time with NumPy; other labels fall back to calling the
+    scalar generator once per row.
+
     Args:
         node_types: dict of {label: property_generator_function}
         num_nodes_per_type: dict of {label: count}
-    
+        rng: optional np.random.Generator for the batched path; worker
+             seeds derive from it, so seeding it makes parallel runs
+             reproducible too (their streams differ from serial runs)
+        parallel: generate labels in worker processes (requires every
+                  label to have a batched generator)
+        wide: return typed property columns instead of a dict per row
+              (requires batched generators)
+
     Returns:
-        DataFrame with columns: id, label, properties (as dict)
+        DataFrame with columns: id, label, properties (as dict) — or,
+        with wide=True, id, label, and one typed column per property
     """
-    nodes = []
-    node_id = 1
-    
-    for label, count in num_nodes_per_type.items():
+    if rng is None:
+        rng = np.random.default_rng()
+
+    for label in num_nodes_per_type:
         if label not in node_types:
             raise ValueError(f"No property generator for label: {label}")
-        
-        prop_generator = node_types[label]
-        
-        for i in range(count):
-            properties = prop_generator(i)
-            nodes.append({
-                'id': node_id,
-                'label': label,
-                'properties': properties
-            })
-            node_id += 1
-    
-    return pd.DataFrame(nodes)
+
+    labels = list(num_nodes_per_type)
+    counts = [num_nodes_per_type[label] for label in labels]
+    # Cumulative starts assign each label a contiguous id range up
+    # front, so ids stay unique with no shared scalar counter
+    starts = np.cumsum([1] + counts)[:-1]
+
+    if wide:
+        # Typed struct-of-arrays layout: far smaller than a dict per row
+        # (no per-row PyDict, ints/floats stay unboxed, low-cardinality
+        # strings dictionary-encode) and every later step stays on
+        # pandas' C paths. The dict layout remains the default because
+        # nodes.csv and the loaders expect it.
+        wide_frames = []
+        for label, count, start in zip(labels, counts, starts):
+            batch_generator = node_types_batch.get(label)
+            if batch_generator is None:
+                raise ValueError(f"wide=True requires a batched generator for {label}")
+            frame = pd.DataFrame({'id': np.arange(start, start + count)})
+            frame['label'] = label
+            for column, values in batch_generator(count, rng).items():
+                arr = np.asarray(values)
+                if column in _LOW_CARDINALITY_COLUMNS:
+                    frame[column] = pd.Categorical(arr)
+                elif arr.dtype == np.float64:
+                    frame[column] = arr.astype(np.float32)
+                else:
+                    frame[column] = arr
+            wide_frames.append(frame)
+        out = pd.concat(wide_frames, ignore_index=True, copy=False)
+        out['label'] = out['label'].astype('category')
+        return out
+
+    if parallel and all(label in node_types_batch for label in labels):
+        # Each worker gets an independent seed spawned from entropy
+        # drawn off the caller's generator, so parallel runs are
+        # reproducible for a seeded rng (though the label streams
+        # differ from the serial path's single shared stream)
+        seeds = np.random.SeedSequence(
+            int(rng.integers(0, 2**63))).spawn(len(labels))
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=min(len(labels), os.cpu_count())) as executor:
+            futures = [executor.submit(_generate_label, label, count, int(start), seed)
+                       for label, count, start, seed in zip(labels, counts, starts, seeds)]
+            frames = [future.result() for future in futures]
+        return pd.concat(frames, ignore_index=True)
+
+    # Every label contributes a ready per-label frame; a single concat
+    # replaces the old list-of-row-dicts that pandas had to transpose
+    frames = []
+
+    for label, count, start in zip(labels, counts, starts):
+        batch_generator = node_types_batch.get(label)
+        if batch_generator is not None:
+            prop_df = pd.DataFrame(batch_generator(count, rng))
+            # Rows become dicts only here, at the boundary, because
+            # nodes.csv stores a properties dict per row
+            properties = prop_df.to_dict(orient='records')
+        else:
+            prop_generator = node_types[label]
+            properties = [prop_generator(i) for i in range(count)]
+
+        frames.append(pd.DataFrame({
+            'id': np.arange(start, start + count),
+            'label': label,
+            'properties': properties,
+        }))
+
+    return pd.concat(frames, ignore_index=True, copy=False)
+
+# Choice pools hoisted to module level so generators do not rebuild
+# the list literals on every call
+FIRST_NAMES = ('Alice', 'Bob', 'Charlie', 'Diana', 'Eve', 'Frank', 'Grace', 'Henry',
+               'Iris', 'Jack', 'Kelly', 'Leo', 'Mia', 'Noah', 'Olivia', 'Paul')
+LAST_NAMES = ('Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller',
+              'Davis', 'Rodriguez', 'Martinez', 'Hernandez', 'Lopez')
+INDUSTRIES = ('Technology', 'Finance', 'Healthcare', 'Retail', 'Manufacturing',
+              'Education', 'Entertainment', 'Energy')
+CATEGORIES = ('Electronics', 'Clothing', 'Food', 'Books', 'Tools',
+              'Sports', 'Beauty', 'Home')
+CITIES = ('New York', 'Los Angeles', 'Chicago', 'Houston', 'Phoenix',
+          'Philadelphia', 'San Antonio', 'San Diego', 'Dallas', 'San Jose')
+
+# NumPy copies of the pools for the batched generators: drawing indices
+# with rng.integers and fancy-indexing skips rng.choice's per-call
+# conversion of the tuple into an array
+FIRST_NAMES_ARR = np.array(FIRST_NAMES)
+LAST_NAMES_ARR = np.array(LAST_NAMES)
+INDUSTRIES_ARR = np.array(INDUSTRIES)
+CATEGORIES_ARR = np.array(CATEGORIES)
+CITIES_ARR = np.array(CITIES)
 
 # Property generators for different node types
 def person_properties(index):
     """Generate properties for Person nodes."""
-    first_names = ['Alice', 'Bob', 'Charlie', 'Diana', 'Eve', 'Frank', 'Grace', 'Henry', 
-                   'Iris', 'Jack', 'Kelly', 'Leo', 'Mia', 'Noah', 'Olivia', 'Paul']
-    last_names = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 
-                  'Davis', 'Rodriguez', 'Martinez', 'Hernandez', 'Lopez']
-    
     return {
-        'name': f"{random.choice(first_names)} {random.choice(last_names)}",
+        'name': f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)}",
         'age': random.randint(18, 80),
         'email': f"user{index}@example.com",
         'created_at': (datetime.now() - timedelta(days=random.randint(0, 365))).isoformat()
@@ -51,12 +156,9 @@ def person_properties(index):
 
 def company_properties(index):
     """Generate properties for Company nodes."""
-    industries = ['Technology', 'Finance', 'Healthcare', 'Retail', 'Manufacturing', 
-                  'Education', 'Entertainment', 'Energy']
-    
     return {
         'name': f"Company_{index}",
-        'industry': random.choice(industries),
+        'industry': random.choice(INDUSTRIES),
         'employees': random.randint(10, 10000),
         'revenue': round(random.uniform(1000000, 100000000), 2),
         'founded_year': random.randint(1980, 2023)
@@ -64,12 +166,9 @@ def company_properties(index):
 
 def product_properties(index):
     """Generate properties for Product nodes."""
-    categories = ['Electronics', 'Clothing', 'Food', 'Books', 'Tools', 
-                  'Sports', 'Beauty', 'Home']
-    
     return {
         'name': f"Product_{index}",
-        'category': random.choice(categories),
+        'category': random.choice(CATEGORIES),
         'price': round(random.uniform(10, 1000), 2),
         'in_stock': random.choice([True, False]),
         'rating': round(random.uniform(1, 5), 1)
@@ -77,17 +176,72 @@ def product_properties(index):
 
 def location_properties(index):
     """Generate properties for Location nodes."""
-    cities = ['New York', 'Los Angeles', 'Chicago', 'Houston', 'Phoenix', 
-              'Philadelphia', 'San Antonio', 'San Diego', 'Dallas', 'San Jose']
-    
     return {
-        'name': random.choice(cities),
+        'name': random.choice(CITIES),
         'country': 'USA',
         'latitude': round(random.uniform(25, 50), 6),
         'longitude': round(random.uniform(-125, -65), 6),
         'population': random.randint(100000, 10000000)
     }
 
+# Batched generators: each takes (n, rng) and returns property columns
+# of length n, so a label costs a handful of NumPy calls instead of n
+# Python calls. The scalar generators above remain for back-compat.
+def person_properties_batch(n, rng):
+    """Generate property columns for n Person nodes."""
+    first = FIRST_NAMES_ARR[rng.integers(0, len(FIRST_NAMES_ARR), n)]
+    last = LAST_NAMES_ARR[rng.integers(0, len(LAST_NAMES_ARR), n)]
+    return {
+        'name': np.char.add(np.char.add(first, ' '), last),
+        'age': rng.integers(18, 81, n),
+        'email': np.char.mod('user%d@example.com', np.arange(n)),
+        # One clock read and one vectorized subtraction for the whole
+        # column, instead of datetime.now() + isoformat() per row
+        'created_at': np.datetime_as_string(
+            np.datetime64(datetime.now().replace(microsecond=0))
+            - rng.integers(0, 366, n).astype('timedelta64[D]'),
+            unit='s'),
+    }
+
+def company_properties_batch(n, rng):
+    """Generate property columns for n Company nodes."""
+    return {
+        'name': np.char.mod('Company_%d', np.arange(n)),
+        'industry': INDUSTRIES_ARR[rng.integers(0, len(INDUSTRIES_ARR), n)],
+        'employees': rng.integers(10, 10001, n),
+        'revenue': np.round(rng.uniform(1000000, 100000000, n), 2),
+        'founded_year': rng.integers(1980, 2024, n),
+    }
+
+def product_properties_batch(n, rng):
+    """Generate property columns for n Product nodes."""
+    return {
+        'name': np.char.mod('Product_%d', np.arange(n)),
+        'category': CATEGORIES_ARR[rng.integers(0, len(CATEGORIES_ARR), n)],
+        'price': np.round(rng.uniform(10, 1000, n), 2),
+        'in_stock': rng.integers(0, 2, n).astype(bool),
+        'rating': np.round(rng.uniform(1, 5, n), 1),
+    }
+
+def location_properties_batch(n, rng):
+    """Generate property columns for n Location nodes."""
+    return {
+        'name': CITIES_ARR[rng.integers(0, len(CITIES_ARR), n)],
+        'country': np.full(n, 'USA'),
+        'latitude': np.round(rng.uniform(25, 50, n), 6),
+        'longitude': np.round(rng.uniform(-125, -65, n), 6),
+        'population': rng.integers(100000, 10000001, n),
+    }
+
+# Batched generators keyed by label; generate_nodes prefers these over
+# the scalar per-row generators
+node_types_batch = {
+    'Person': person_properties_batch,
+    'Company': company_properties_batch,
+    'Product': product_properties_batch,
+    'Location': location_properties_batch,
+}
+
 # Example usage
 if __name__ == "__main__":
     node_types = {
@@ -106,7 +260,13 @@ if __name__ == "__main__":
     
     df_nodes = generate_nodes(node_types, num_nodes)
     
-    # Save to CSV
-    df_nodes.to_csv('nodes.csv', index=False)
+    # Save to CSV through a 4 MiB buffer, streaming in chunks rather
+    # than building one giant string; to_csv's default 8 KB buffering
+    # makes the write syscall-bound long before it is IO-bound.
+    # Properties cells are JSON, so consumers parse them with a real
+    # JSON parser instead of evaluating dict reprs.
+    with open('nodes.csv', 'w', newline='', buffering=4 * 1024 * 1024) as fh:
+        df_nodes.assign(properties=df_nodes['properties'].map(json.dumps)) \
+            .to_csv(fh, index=False, lineterminator='\n', chunksize=50_000)
     print(f"Generated {len(df_nodes)} nodes")
     print(df_nodes.head(10))
@@ -1,246 +1,787 @@
 # load_to_age.py
+import ast
+import concurrent.futures
+import io
+import json
+import struct
+import threading
 import pandas as pd
 import time
+from contextlib import contextmanager
+from psycopg2 import sql
+from psycopg2.extras import execute_batch
 from db_connection import get_connection
 from config import GRAPH_NAME
 
-def load_nodes_to_age(nodes_df, graph_name=GRAPH_NAME, batch_size=100):
+try:
+    import orjson
+except ImportError:  # optional fast path; stdlib json is the fallback
+    orjson = None
+
+# How many EXECUTE statements execute_batch joins into one SQL string
+# per round-trip. cypher() takes exactly one agtype parameter, so a
+# VALUES-list (execute_values) cannot feed it; joining prepared EXECUTEs
+# is the same "one big SQL string" mechanism with one Parse overall.
+EXECUTE_PAGE_SIZE = 100
+
+# Serializes progress output when edge partitions load concurrently
+_print_lock = threading.Lock()
+
+@contextmanager
+def _connection_scope(conn=None):
+    """Yield the caller's connection, or check one out of the pool.
+
+    Letting main.py own a single long-lived connection saves a
+    handshake and an AGE extension load per phase.
+    """
+    if conn is not None:
+        yield conn
+    else:
+        with get_connection() as pooled:
+            yield pooled
+
+# PREPARE templates keyed by (graph_name, label, property keys): chunked
+# loads hit the same label once per chunk, so the statement text is
+# assembled once and reused instead of rebuilt every call
+_stmt_cache = {}
+
+def _node_stmt(graph_name, label, keys):
+    """Return the cached PREPARE statement for one node label."""
+    cache_key = (graph_name, label, keys)
+    stmt = _stmt_cache.get(cache_key)
+    if stmt is None:
+        props_tpl = "".join(f", {k}: row.{k}" for k in keys)
+        # graph_name goes through sql.Literal so the statement text is
+        # quoted correctly regardless of the name; the label sits inside
+        # the dollar-quoted Cypher body, which only the Cypher parser
+        # sees
+        stmt = (sql.SQL("PREPARE bulk_nodes(agtype) AS "
+                        "SELECT * FROM cypher(")
+                + sql.Literal(graph_name)
+                + sql.SQL(f""", $$
+            UNWIND $rows AS row
+            CREATE (n:{label} {{id: row.id{props_tpl}}})
+        $$, $1) as (v agtype);"""))
+        _stmt_cache[cache_key] = stmt
+    return stmt
+
+def _edge_stmt(graph_name, edge_label, keys, from_tag, to_tag):
+    """Return the cached PREPARE statement for one edge label."""
+    cache_key = (graph_name, edge_label, keys, from_tag, to_tag)
+    stmt = _stmt_cache.get(cache_key)
+    if stmt is None:
+        props_tpl = ", ".join(f"{k}: row.{k}" for k in keys)
+        props_clause = f" {{{props_tpl}}}" if props_tpl else ""
+        stmt = (sql.SQL("PREPARE bulk_edges(agtype) AS "
+                        "SELECT * FROM cypher(")
+                + sql.Literal(graph_name)
+                + sql.SQL(f""", $$
+            UNWIND $rows AS row
+            MATCH (a{from_tag} {{id: row.from_id}}), (b{to_tag} {{id: row.to_id}})
+            CREATE (a)-[r:{edge_label}{props_clause}]->(b)
+        $$, $1) as (v agtype);"""))
+        _stmt_cache[cache_key] = stmt
+    return stmt
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+def _dumps(obj):
+    """Serialize one batch payload to JSON, via orjson when present.
+
+    Each UNWIND batch is serialized in a single call — one C-level pass
+    over thousands of rows rather than one dumps per row.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
+def _loads(text):
+    """Parse one serialized properties cell (JSON, or a legacy dict repr)."""
+    try:
+        return _json_loads(text)
+    except ValueError:
+        # Older CSVs stored str(dict); literal_eval only accepts
+        # literals, unlike eval which compiles and runs arbitrary Python
+        return ast.literal_eval(text)
+
+def _copy_text_escape(text):
+    """Escape one field for COPY ... FROM STDIN text format.
+
+    COPY text treats backslash as an escape introducer and tab/newline
+    as delimiters, and the server unescapes on read — so the backslash
+    escapes JSON itself contains (\\", \\\\, \\t) must be doubled, or any
+    string property holding a quote, backslash, or tab comes out of
+    COPY as corrupted JSON and fails the agtype cast.
+    """
+    return (text.replace('\\', '\\\\')
+                .replace('\t', '\\t')
+                .replace('\n', '\\n')
+                .replace('\r', '\\r'))
+
+def _parse_properties(series):
+    """Parse a serialized properties column in one vectorized pass.
+
+    Doing this once before the row loop replaces a per-row parse with a
+    single map over the column.
+    """
+    if len(series) and isinstance(series.iat[0], str):
+        return series.map(_loads)
+    return series
+
+# exec-compiled JSON encoders keyed by one label's (keys, value types):
+# partial evaluation for the schema the generators fix per label
+_encoder_cache = {}
+
+def _make_row_encoder(sample_props):
+    """Compile a JSON encoder specialized to one property schema.
+
+    Every row of a label shares the sample's keys and value types, so
+    the generic dict walk inside dumps can be replaced by generated
+    code with the key literals inlined; only string values still pay
+    an escaping call. Numbers and bools format directly.
+    """
+    keys = tuple(sample_props)
+    kinds = tuple(isinstance(sample_props[k], bool) and 'b'
+                  or isinstance(sample_props[k], (int, float)) and 'n'
+                  or 's'
+                  for k in keys)
+    cache_key = (keys, kinds)
+    encoder = _encoder_cache.get(cache_key)
+    if encoder is not None:
+        return encoder
+
+    parts = ["'{\"id\":' + str(node_id)"]
+    for k, kind in zip(keys, kinds):
+        if kind == 'b':
+            parts.append(f"',\"{k}\":' + ('true' if props[{k!r}] else 'false')")
+        elif kind == 'n':
+            parts.append(f"',\"{k}\":' + str(props[{k!r}])")
+        else:
+            parts.append(f"',\"{k}\":' + _esc(props[{k!r}])")
+    parts.append("'}'")
+
+    source = ("def _encode(node_id, props, _esc=json.dumps):\n"
+              "    return " + " + ".join(parts) + "\n")
+    namespace = {'json': json}
+    exec(source, namespace)
+    encoder = namespace['_encode']
+    _encoder_cache[cache_key] = encoder
+    return encoder
+
+# Fixed framing for COPY ... WITH (FORMAT binary): signature + flags +
+# extension-length header, and the end-of-data trailer
+_PGCOPY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('!ii', 0, 0)
+_PGCOPY_TRAILER = struct.pack('!h', -1)
+
+def _copy_label_binary(cur, graph_name, label, prop_dicts):
+    """COPY one label's property dicts using the binary wire format.
+
+    agtype has no binary receive function, so the length-prefixed rows
+    land in a temp jsonb staging table (no CSV lexing or escaping on
+    either side) and move into the label table with one
+    INSERT ... SELECT cast.
+    """
+    cur.execute('CREATE TEMP TABLE IF NOT EXISTS _props_stage(properties jsonb)')
+    cur.execute('TRUNCATE _props_stage')
+
+    buf = io.BytesIO()
+    buf.write(_PGCOPY_HEADER)
+    for props in prop_dicts:
+        # jsonb binary payload: 1-byte version tag, then the utf8 text
+        payload = b'\x01' + _dumps(props).encode()
+        buf.write(struct.pack('!hi', 1, len(payload)))
+        buf.write(payload)
+    buf.write(_PGCOPY_TRAILER)
+    buf.seek(0)
+
+    cur.copy_expert(
+        'COPY _props_stage(properties) FROM STDIN WITH (FORMAT binary)', buf)
+    cur.execute(sql.SQL('INSERT INTO {}(properties) '
+                        'SELECT properties::text::agtype FROM _props_stage')
+                .format(sql.Identifier(graph_name, label)))
+
+def _cypher_literal(value):
+    """Format one property value as a Cypher literal."""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return str(value)
+    escaped = str(value).replace('\\', '\\\\').replace("'", "\\'")
+    return f"'{escaped}'"
+
+def _multicreate_nodes(cur, graph_name, label, group, per_stmt=100):
+    """Send nodes as blocks of inlined CREATE clauses, one cypher() each.
+
+    Fallback batching for servers where the cypher() parameter argument
+    is unavailable: no UNWIND and no bind parameters, just K CREATEs
+    joined into one block, so round-trips still drop by K.
+    """
+    ids = group['id'].to_numpy()
+    all_props = group['properties'].to_numpy()
+    for start in range(0, len(ids), per_stmt):
+        clauses = []
+        for node_id, props in zip(ids[start:start + per_stmt],
+                                  all_props[start:start + per_stmt]):
+            pairs = "".join(f", {k}: {_cypher_literal(v)}"
+                            for k, v in (props or {}).items())
+            clauses.append(f"CREATE (:{label} {{id: {int(node_id)}{pairs}}})")
+        block = "\n                    ".join(clauses)
+        cur.execute(sql.SQL("SELECT * FROM cypher(")
+                    + sql.Literal(graph_name)
+                    + sql.SQL(f""", $$
+            {block}
+        $$) as (v agtype);"""))
+
+def _copy_nodes(nodes_df, graph_name, binary=False, conn=None):
+    """COPY nodes straight into the per-label storage tables.
+
+    Bypasses the Cypher parser entirely: one COPY ... FROM STDIN per
+    label, with the external id folded into the properties JSON the
+    same way the CREATE path stores it. Expects properties already
+    parsed to dicts.
+    """
+    # Lazy import: only the COPY path needs the label helper, and
+    # Csvfreighter_loader drags in the agefreighter dependency
+    from Csvfreighter_loader import _ensure_label
+
+    with _connection_scope(conn) as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute("SET LOCAL synchronous_commit = OFF")
+            loaded_count = 0
+            for label, group in nodes_df.groupby('label', sort=False, observed=True):
+                _ensure_label(cur, graph_name, label, 'v')
+                if binary:
+                    prop_dicts = []
+                    for node_id, props in zip(group['id'].to_numpy(),
+                                              group['properties'].to_numpy()):
+                        props = dict(props or {})
+                        props['id'] = int(node_id)
+                        prop_dicts.append(props)
+                    _copy_label_binary(cur, graph_name, label, prop_dicts)
+                else:
+                    # Specialized encoder for this label's fixed schema:
+                    # no per-row dict copy, no generic dumps walk
+                    encode = _make_row_encoder(group['properties'].iat[0] or {})
+                    buf = io.StringIO()
+                    for node_id, props in zip(group['id'].to_numpy(),
+                                              group['properties'].to_numpy()):
+                        buf.write(_copy_text_escape(
+                            encode(int(node_id), props or {})) + '\n')
+                    buf.seek(0)
+                    cur.copy_expert(
+                        sql.SQL('COPY {}(properties) FROM STDIN')
+                        .format(sql.Identifier(graph_name, label)), buf)
+                loaded_count += len(group)
+                print(f"  ✓ Copied {len(group):,} {label} vertices")
+            conn.commit()
+            return loaded_count
+        except Exception as e:
+            conn.rollback()
+            print(f"\n✗ Error copying nodes: {e}")
+            raise
+        finally:
+            cur.close()
+
+def load_nodes_to_age(nodes_df, graph_name=GRAPH_NAME, batch_size=1000,
+                      use_copy=False, binary_copy=False, conn=None,
+                      multi_create=False):
     """
     Load nodes from DataFrame into AGE graph with batching and progress updates.
-    
+
+    Nodes are grouped by label and sent through UNWIND, so a batch of
+    1000 nodes costs one Cypher parse and one round-trip instead of
+    1000. Rows are bound through cypher()'s agtype parameter argument.
+
     Args:
         nodes_df: DataFrame containing node data
         graph_name: Name of the graph
-        batch_size: Number of nodes to commit in each batch
+        batch_size: Number of nodes per UNWIND batch
+        use_copy: COPY into the label storage tables instead of running
+            Cypher CREATE — fastest path, but assumes a fresh graph
+        binary_copy: with use_copy, use COPY's binary wire format via a
+            jsonb staging table; skips CSV lexing on the server side
+        conn: optional open connection to reuse; defaults to checking
+            one out of the pool
+        multi_create: batch by joining inlined CREATE clauses into one
+            Cypher block instead of UNWIND — fallback for servers where
+            cypher()'s parameter argument is unavailable
     """
-    import time
-    
-    conn = get_connection()
-    cur = conn.cursor()
-    
     total_nodes = len(nodes_df)
-    loaded_count = 0
     start_time = time.time()
-    
-    try:
-        cur.execute("LOAD 'age';")
-        cur.execute("SET search_path = ag_catalog, '$user', public;")
-        
-        print(f"\n{'='*70}")
-        print(f"Loading {total_nodes:,} nodes into graph '{graph_name}'")
-        print(f"Batch size: {batch_size}")
-        print(f"{'='*70}\n")
-        
-        for idx, row in nodes_df.iterrows():
-            node_id = row['id']
-            label = row['label']
-            
-            # Parse properties from string if needed
-            if isinstance(row['properties'], str):
-                properties = eval(row['properties'])
-            else:
-                properties = row['properties']
-            
-            # Convert properties to AGE format
-            props_str = ", ".join([f"{k}: '{v}'" if isinstance(v, str) else f"{k}: {v}" 
-                                   for k, v in properties.items()])
-            
-            # Create Cypher query
-            cypher_query = f"""
-            SELECT * FROM cypher('{graph_name}', $$
-                CREATE (n:{label} {{id: {node_id}, {props_str}}})
-                RETURN n
-            $$) as (v agtype);
-            """
-            
-            cur.execute(cypher_query)
-            loaded_count += 1
-            
-            # Commit in batches
-            if loaded_count % batch_size == 0:
-                conn.commit()
+
+    print(f"\n{'='*70}")
+    print(f"Loading {total_nodes:,} nodes into graph '{graph_name}'")
+    print(f"Batch size: {batch_size}")
+    print(f"{'='*70}\n")
+
+    # Parse the whole properties column up front; the row loop then
+    # only assembles dicts
+    nodes_df = nodes_df.assign(
+        properties=_parse_properties(nodes_df['properties']))
+
+    if use_copy:
+        loaded_count = _copy_nodes(nodes_df, graph_name, binary=binary_copy,
+                                   conn=conn)
+        elapsed_time = time.time() - start_time
+        print(f"\n{'─'*70}")
+        print(f"✓ Loaded {loaded_count:,} nodes in {elapsed_time:.2f} seconds (COPY)")
+        print(f"{'─'*70}\n")
+        return
+
+    with _connection_scope(conn) as conn:
+        cur = conn.cursor()
+        loaded_count = 0
+
+        try:
+            # Bulk-load posture: the whole ingest is one transaction and
+            # WAL durability is relaxed for its duration, so the server
+            # fsyncs once at the final commit instead of once per batch
+            cur.execute("SET LOCAL synchronous_commit = OFF")
+
+            for label, group in nodes_df.groupby('label', sort=False, observed=True):
+                if multi_create:
+                    _multicreate_nodes(cur, graph_name, label, group,
+                                       per_stmt=min(batch_size, 100))
+                    loaded_count += len(group)
+                    print(f"Progress: {loaded_count:,}/{total_nodes:,} | "
+                          f"Label: {label} (multi-CREATE)")
+                    continue
+
+                # All rows of a label share the same property keys (the
+                # generators fix the schema per label), so the Cypher
+                # map is a per-group template, cached across calls
+                first_props = group['properties'].iat[0] or {}
+
+                # Zip the underlying arrays: no per-row Series
+                # materialization or label-based __getitem__, unlike
+                # iterrows
+                rows = [{'id': int(node_id), **(props or {})}
+                        for node_id, props in zip(group['id'].to_numpy(),
+                                                  group['properties'].to_numpy())]
+
+                # Prepared once per label: the server parses and plans
+                # the cypher() wrapper a single time, and every batch is
+                # just a Bind/Execute of the agtype parameter
+                cur.execute(_node_stmt(graph_name, label, tuple(first_props)))
+                try:
+                    # execute_batch pipelines the per-batch statements so
+                    # several batches share one round-trip
+                    params = [(_dumps({'rows': rows[start:start + batch_size]}),)
+                              for start in range(0, len(rows), batch_size)]
+                    execute_batch(cur, "EXECUTE bulk_nodes(%s);", params, page_size=EXECUTE_PAGE_SIZE)
+                finally:
+                    cur.execute("DEALLOCATE bulk_nodes;")
+                loaded_count += len(rows)
+
                 elapsed_time = time.time() - start_time
                 progress_pct = (loaded_count / total_nodes) * 100
                 rate = loaded_count / elapsed_time
                 eta = (total_nodes - loaded_count) / rate if rate > 0 else 0
-                
+
                 print(f"Progress: {loaded_count:,}/{total_nodes:,} ({progress_pct:.1f}%) | "
+                      f"Label: {label} | "
                       f"Rate: {rate:.1f} nodes/sec | "
                       f"ETA: {eta:.1f}s")
-        
-        # Final commit for remaining nodes
-        conn.commit()
-        
-        elapsed_time = time.time() - start_time
-        print(f"\n{'─'*70}")
-        print(f"✓ Loaded {loaded_count:,} nodes in {elapsed_time:.2f} seconds")
-        print(f"  Average rate: {loaded_count/elapsed_time:.1f} nodes/sec")
-        print(f"{'─'*70}\n")
-        
-    except Exception as e:
-        conn.rollback()
-        print(f"\n✗ Error loading nodes at node {loaded_count + 1}: {e}")
-        raise
-    finally:
-        cur.close()
-        conn.close()
 
-def load_edges_to_age(edges_df, graph_name=GRAPH_NAME, batch_size=100):
+            # Single commit for the whole load
+            conn.commit()
+
+            elapsed_time = time.time() - start_time
+            print(f"\n{'─'*70}")
+            print(f"✓ Loaded {loaded_count:,} nodes in {elapsed_time:.2f} seconds")
+            print(f"  Average rate: {loaded_count/elapsed_time:.1f} nodes/sec")
+            print(f"{'─'*70}\n")
+
+        except Exception as e:
+            conn.rollback()
+            print(f"\n✗ Error loading nodes after {loaded_count:,} nodes: {e}")
+            raise
+        finally:
+            cur.close()
+
+def resolve_ids(graph_name, labels=None, conn=None):
+    """Map external node ids to AGE's internal graphids.
+
+    One SELECT per vertex label replaces two MATCH-by-property lookups
+    per edge: edge construction becomes a pair of O(1) dict hits.
+
+    Args:
+        graph_name: Name of the graph
+        labels: vertex labels to read; defaults to every vertex label
+            in the graph's catalog
+        conn: optional open connection to reuse
+
+    Returns:
+        dict of {external id: graphid}
+    """
+    with _connection_scope(conn) as conn:
+        cur = conn.cursor()
+        try:
+            if labels is None:
+                cur.execute("""
+                    SELECT name FROM ag_catalog.ag_label
+                    WHERE graph = (SELECT graphid FROM ag_catalog.ag_graph WHERE name = %s)
+                    AND kind = 'v' AND name <> '_ag_label_vertex';
+                """, (graph_name,))
+                labels = [row[0] for row in cur.fetchall()]
+
+            id_map = {}
+            for label in labels:
+                cur.execute(sql.SQL(
+                    'SELECT id, agtype_access_operator(properties, \'"id"\'::agtype) '
+                    'FROM {};').format(sql.Identifier(graph_name, label)))
+                for graphid, prop_id in cur.fetchall():
+                    id_map[int(str(prop_id))] = graphid
+            return id_map
+        finally:
+            cur.close()
+
+def _copy_edges(edges_df, graph_name, id_map, conn=None):
+    """COPY edges straight into the per-label edge tables.
+
+    Endpoints come pre-resolved to graphids through id_map, so no
+    Cypher MATCH runs at all. Expects properties already parsed.
+    """
+    from Csvfreighter_loader import _ensure_label
+
+    with _connection_scope(conn) as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute("SET LOCAL synchronous_commit = OFF")
+            loaded_count = 0
+            for edge_label, group in edges_df.groupby('edge_label', sort=False,
+                                                      observed=True):
+                _ensure_label(cur, graph_name, edge_label, 'e')
+                buf = io.StringIO()
+                for from_id, to_id, props in zip(group['from_id'].to_numpy(),
+                                                 group['to_id'].to_numpy(),
+                                                 group['properties'].to_numpy()):
+                    buf.write(f"{id_map[from_id]}\t{id_map[to_id]}\t"
+                              f"{_copy_text_escape(_dumps(props or {}))}\n")
+                buf.seek(0)
+                cur.copy_expert(
+                    sql.SQL('COPY {}(start_id, end_id, properties) FROM STDIN')
+                    .format(sql.Identifier(graph_name, edge_label)), buf)
+                loaded_count += len(group)
+                print(f"  ✓ Copied {len(group):,} {edge_label} edges")
+            conn.commit()
+            return loaded_count
+        except Exception as e:
+            conn.rollback()
+            print(f"\n✗ Error copying edges: {e}")
+            raise
+        finally:
+            cur.close()
+
+def _load_edges_chunk(edges_df, graph_name, batch_size, edge_endpoints,
+                      total_edges=None, start_time=None, conn=None):
+    """Load one partition of edges on its own pooled connection.
+
+    Returns the number of edges sent. Used both by the serial path and
+    as the per-worker unit for parallel loading.
+    """
+    if total_edges is None:
+        total_edges = len(edges_df)
+    if start_time is None:
+        start_time = time.time()
+    loaded_count = 0
+
+    with _connection_scope(conn) as conn:
+        cur = conn.cursor()
+        try:
+            # One transaction, one fsync: see load_nodes_to_age
+            cur.execute("SET LOCAL synchronous_commit = OFF")
+
+            for edge_label, group in edges_df.groupby('edge_label', sort=False, observed=True):
+                # Property keys are uniform per edge label, so the
+                # relationship map is a per-group template, cached
+                # across calls
+                first_props = group['properties'].iat[0] or {}
+
+                # Zip over the raw columns instead of iterrows
+                rows = [{'from_id': int(from_id), 'to_id': int(to_id),
+                         **(props or {})}
+                        for from_id, to_id, props in zip(group['from_id'].to_numpy(),
+                                                         group['to_id'].to_numpy(),
+                                                         group['properties'].to_numpy())]
+
+                # Typed endpoints turn the MATCH from a scan across all
+                # vertex labels into two per-label index lookups
+                from_tag = to_tag = ''
+                if edge_endpoints and edge_label in edge_endpoints:
+                    from_label, to_label = edge_endpoints[edge_label]
+                    from_tag = f":{from_label}"
+                    to_tag = f":{to_label}"
+
+                # Prepared once per label, executed per batch
+                cur.execute(_edge_stmt(graph_name, edge_label, tuple(first_props),
+                                       from_tag, to_tag))
+                try:
+                    params = [(_dumps({'rows': rows[start:start + batch_size]}),)
+                              for start in range(0, len(rows), batch_size)]
+                    execute_batch(cur, "EXECUTE bulk_edges(%s);", params, page_size=EXECUTE_PAGE_SIZE)
+                finally:
+                    cur.execute("DEALLOCATE bulk_edges;")
+                loaded_count += len(rows)
+
+                elapsed_time = time.time() - start_time
+                progress_pct = (loaded_count / total_edges) * 100
+                rate = loaded_count / elapsed_time
+                eta = (total_edges - loaded_count) / rate if rate > 0 else 0
+
+                with _print_lock:
+                    print(f"Progress: {loaded_count:,}/{total_edges:,} ({progress_pct:.1f}%) | "
+                          f"Label: {edge_label} | "
+                          f"Rate: {rate:.1f} edges/sec | "
+                          f"ETA: {eta:.1f}s")
+
+            # Single commit for the whole partition
+            conn.commit()
+            return loaded_count
+
+        except Exception as e:
+            conn.rollback()
+            with _print_lock:
+                print(f"\n✗ Error loading edges: {e}")
+            raise
+        finally:
+            cur.close()
+
+def load_edges_to_age(edges_df, graph_name=GRAPH_NAME, batch_size=1000,
+                      edge_endpoints=None, workers=1, conn=None,
+                      use_copy=False):
     """
     Load edges from DataFrame into AGE graph with batching and progress updates.
-    
+
+    Edges are grouped by label and sent through UNWIND, one Cypher parse
+    and one round-trip per batch. Edges whose endpoints are missing
+    simply match nothing and create no relationship, so they no longer
+    raise per-row errors.
+
     Args:
         edges_df: DataFrame containing edge data
         graph_name: Name of the graph
-        batch_size: Number of edges to commit in each batch
+        batch_size: Number of edges per UNWIND batch
+        edge_endpoints: optional {edge_label: (from_label, to_label)};
+            when given, endpoints are matched with typed labels so the
+            planner can use the per-label id indexes instead of
+            scanning every vertex label
+        workers: number of concurrent connections; edges are hash-
+            partitioned by from_id so each source vertex's edges stay
+            on one worker. Threads suffice because libpq releases the
+            GIL while waiting on the server.
+        conn: optional open connection reused by the serial path;
+            parallel workers always use their own pooled connections
+        use_copy: resolve every endpoint's graphid up front and COPY
+            straight into the edge tables — no Cypher MATCH at all;
+            requires the nodes to be loaded already
     """
-    import time
-    
-    conn = get_connection()
-    cur = conn.cursor()
-    
     total_edges = len(edges_df)
-    loaded_count = 0
-    skipped_count = 0
     start_time = time.time()
-    
-    try:
-        cur.execute("LOAD 'age';")
-        cur.execute("SET search_path = ag_catalog, '$user', public;")
-        
-        print(f"\n{'='*70}")
-        print(f"Loading {total_edges:,} edges into graph '{graph_name}'")
-        print(f"Batch size: {batch_size}")
-        print(f"{'='*70}\n")
-        
-        for idx, row in edges_df.iterrows():
-            from_id = row['from_id']
-            to_id = row['to_id']
-            edge_label = row['edge_label']
-            
-            # Parse properties from string if needed
-            if isinstance(row['properties'], str):
-                properties = eval(row['properties'])
-            else:
-                properties = row['properties']
-            
-            # Convert properties to AGE format
-            if properties:
-                props_str = ", ".join([f"{k}: '{v}'" if isinstance(v, str) else f"{k}: {v}" 
-                                       for k, v in properties.items()])
-                props_clause = f"{{{props_str}}}"
-            else:
-                props_clause = ""
-            
-            # Create Cypher query
-            cypher_query = f"""
-            SELECT * FROM cypher('{graph_name}', $$
-                MATCH (a), (b)
-                WHERE a.id = {from_id} AND b.id = {to_id}
-                CREATE (a)-[r:{edge_label} {props_clause}]->(b)
-                RETURN r
-            $$) as (v agtype);
-            """
-            
-            try:
-                cur.execute(cypher_query)
-                loaded_count += 1
-            except Exception as edge_error:
-                skipped_count += 1
-                if skipped_count <= 5:  # Only print first few errors
-                    print(f"Warning: Skipped edge {from_id}->{to_id}: {edge_error}")
-            
-            processed_count = loaded_count + skipped_count
-            
-            # Commit in batches
-            if processed_count % batch_size == 0:
-                conn.commit()
-                elapsed_time = time.time() - start_time
-                progress_pct = (processed_count / total_edges) * 100
-                rate = processed_count / elapsed_time
-                eta = (total_edges - processed_count) / rate if rate > 0 else 0
-                
-                print(f"Progress: {processed_count:,}/{total_edges:,} ({progress_pct:.1f}%) | "
-                      f"Loaded: {loaded_count:,} | Skipped: {skipped_count:,} | "
-                      f"Rate: {rate:.1f} edges/sec | "
-                      f"ETA: {eta:.1f}s")
-        
-        # Final commit for remaining edges
-        conn.commit()
-        
+
+    print(f"\n{'='*70}")
+    print(f"Loading {total_edges:,} edges into graph '{graph_name}'")
+    print(f"Batch size: {batch_size} | Workers: {workers}")
+    print(f"{'='*70}\n")
+
+    # Parse the whole properties column up front
+    edges_df = edges_df.assign(
+        properties=_parse_properties(edges_df['properties']))
+
+    if use_copy:
+        id_map = resolve_ids(graph_name, conn=conn)
+        loaded_count = _copy_edges(edges_df, graph_name, id_map, conn=conn)
         elapsed_time = time.time() - start_time
         print(f"\n{'─'*70}")
-        print(f"✓ Loaded {loaded_count:,} edges in {elapsed_time:.2f} seconds")
-        if skipped_count > 0:
-            print(f"  ⚠ Skipped {skipped_count:,} edges (nodes not found or other errors)")
-        print(f"  Average rate: {loaded_count/elapsed_time:.1f} edges/sec")
+        print(f"✓ Loaded {loaded_count:,} edges in {elapsed_time:.2f} seconds (COPY)")
         print(f"{'─'*70}\n")
-        
-    except Exception as e:
-        conn.rollback()
-        print(f"\n✗ Error loading edges: {e}")
-        raise
-    finally:
-        cur.close()
-        conn.close()
-
-def create_indexes(graph_name=GRAPH_NAME):
-    """Create indexes on node IDs for better query performance."""
-    conn = get_connection()
-    cur = conn.cursor()
-    
-    try:
-        cur.execute("LOAD 'age';")
-        cur.execute("SET search_path = ag_catalog, '$user', public;")
-        
-        print(f"\n{'='*70}")
-        print(f"Creating indexes for graph '{graph_name}'")
-        print(f"{'='*70}\n")
-        
-        # Get all vertex labels
-        cur.execute(f"""
-            SELECT name FROM ag_catalog.ag_label 
-            WHERE graph = (SELECT graphid FROM ag_catalog.ag_graph WHERE name = '{graph_name}')
-            AND kind = 'v';
-        """)
-        
-        labels = [row[0] for row in cur.fetchall()]
-        
-        if not labels:
-            print("No vertex labels found. Skipping index creation.")
-            return
-        
-        print(f"Found {len(labels)} vertex labels: {', '.join(labels)}\n")
-        
-        created_count = 0
-        skipped_count = 0
-        
-        for i, label in enumerate(labels, 1):
-            try:
-                # Create index on id property
-                index_query = f"""
-                CREATE INDEX IF NOT EXISTS {label}_id_idx 
-                ON {graph_name}."{label}" ((properties->'id'));
-                """
-                cur.execute(index_query)
-                created_count += 1
-                print(f"[{i}/{len(labels)}] ✓ Created index for {label}.id")
-            except Exception as e:
-                skipped_count += 1
-                print(f"[{i}/{len(labels)}] ⚠ Index for {label}.id: {str(e)[:60]}")
-        
-        conn.commit()
-        
-        print(f"\n{'─'*70}")
-        print(f"Index creation complete:")
-        print(f"  Created: {created_count}")
-        print(f"  Skipped: {skipped_count}")
-        print(f"{'─'*70}\n")
-        
-    except Exception as e:
-        conn.rollback()
-        print(f"\n✗ Error creating indexes: {e}")
-        raise
-    finally:
-        cur.close()
-        conn.close()
+        return
+
+    if workers > 1:
+        shards = [edges_df[edges_df['from_id'] % workers == i]
+                  for i in range(workers)]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_load_edges_chunk, shard, graph_name,
+                                       batch_size, edge_endpoints,
+                                       total_edges, start_time)
+                       for shard in shards if len(shard)]
+            loaded_count = sum(future.result() for future in futures)
+    else:
+        loaded_count = _load_edges_chunk(edges_df, graph_name, batch_size,
+                                         edge_endpoints, total_edges, start_time,
+                                         conn=conn)
+
+    elapsed_time = time.time() - start_time
+    print(f"\n{'─'*70}")
+    print(f"✓ Loaded {loaded_count:,} edges in {elapsed_time:.2f} seconds")
+    print(f"  Average rate: {loaded_count/elapsed_time:.1f} edges/sec")
+    print(f"{'─'*70}\n")
+
+def drop_indexes(graph_name=GRAPH_NAME, conn=None):
+    """
+    Drop the per-label id indexes before a bulk load.
+
+    Left in place (e.g. from a prior run), each index is updated on
+    every insert; dropping them and rebuilding with create_indexes
+    afterwards replaces per-row maintenance with one full build.
+    """
+    with _connection_scope(conn) as conn:
+        cur = conn.cursor()
+        try:
+            # Both families create_indexes builds: the vertex id indexes
+            # and the edge endpoint indexes — on a re-run either one
+            # left in place pays per-row maintenance through the load
+            cur.execute("""
+                SELECT name, kind FROM ag_catalog.ag_label
+                WHERE graph = (SELECT graphid FROM ag_catalog.ag_graph WHERE name = %s)
+                AND kind IN ('v', 'e');
+            """, (graph_name,))
+            labels = cur.fetchall()
+
+            for label, kind in labels:
+                index = (f'{label}_id_idx' if kind == 'v'
+                         else f'{label}_endpoints_idx')
+                cur.execute(sql.SQL('DROP INDEX IF EXISTS {};')
+                            .format(sql.Identifier(graph_name, index)))
+                if kind == 'v':
+                    # Legacy name ensure_id_indexes used before the
+                    # helpers were unified; left behind by older runs
+                    cur.execute(sql.SQL('DROP INDEX IF EXISTS {};')
+                                .format(sql.Identifier(graph_name, f'idx_{label}_id')))
+            conn.commit()
+            if labels:
+                print(f"✓ Dropped indexes for {len(labels)} labels (deferred to after load)")
+        except Exception as e:
+            conn.rollback()
+            print(f"✗ Error dropping indexes: {e}")
+            raise
+        finally:
+            cur.close()
+
+def set_tables_logged(graph_name=GRAPH_NAME, logged=True, conn=None):
+    """
+    Flip every label storage table between LOGGED and UNLOGGED.
+
+    UNLOGGED tables skip WAL writes entirely during the bulk phase;
+    switch back to LOGGED once the load finishes (this rewrites the
+    tables into the WAL, but once, sequentially).
+    """
+    with _connection_scope(conn) as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute("""
+                SELECT name FROM ag_catalog.ag_label
+                WHERE graph = (SELECT graphid FROM ag_catalog.ag_graph WHERE name = %s);
+            """, (graph_name,))
+            labels = [row[0] for row in cur.fetchall()]
+
+            mode = 'LOGGED' if logged else 'UNLOGGED'
+            for label in labels:
+                cur.execute(sql.SQL('ALTER TABLE {} SET ' + mode + ';')
+                            .format(sql.Identifier(graph_name, label)))
+            conn.commit()
+            if labels:
+                print(f"✓ Set {len(labels)} label tables {mode}")
+        except Exception as e:
+            conn.rollback()
+            print(f"✗ Error setting tables {mode}: {e}")
+            raise
+        finally:
+            cur.close()
+
+def create_indexes(graph_name=GRAPH_NAME, maintenance_work_mem=None,
+                   concurrently=False, conn=None):
+    """
+    Create indexes on node IDs for better query performance.
+
+    Vertex labels get the id index; edge labels get a covering
+    (start_id, end_id) index. All DDL goes to the server in a single
+    round-trip unless concurrently is set.
+
+    Args:
+        graph_name: Name of the graph
+        maintenance_work_mem: optional setting (e.g. '1GB') applied for
+            this session so index builds sort in memory; used by
+            main.py's --bulk-load mode
+        concurrently: build with CREATE INDEX CONCURRENTLY so writers
+            are not blocked; requires autocommit, so each index is its
+            own statement instead of one batch
+    """
+    with _connection_scope(conn) as conn:
+        cur = conn.cursor()
+
+        try:
+            print(f"\n{'='*70}")
+            print(f"Creating indexes for graph '{graph_name}'")
+            print(f"{'='*70}\n")
+
+            if maintenance_work_mem:
+                cur.execute("SET maintenance_work_mem = %s", (maintenance_work_mem,))
+
+            # One catalog query for both kinds; binding graph_name
+            # server-side lets the same statement text be reused across
+            # graphs
+            cur.execute("""
+                SELECT name, kind FROM ag_catalog.ag_label
+                WHERE graph = (SELECT graphid FROM ag_catalog.ag_graph WHERE name = %s)
+                AND kind IN ('v', 'e');
+            """, (graph_name,))
+            labels = cur.fetchall()
+
+            vertex_labels = [name for name, kind in labels if kind == 'v']
+            edge_labels = [name for name, kind in labels if kind == 'e']
+
+            if not labels:
+                print("No labels found. Skipping index creation.")
+                return
+
+            print(f"Found {len(vertex_labels)} vertex labels and "
+                  f"{len(edge_labels)} edge labels\n")
+
+            head = sql.SQL('CREATE INDEX CONCURRENTLY IF NOT EXISTS {} ON {} '
+                           if concurrently else
+                           'CREATE INDEX IF NOT EXISTS {} ON {} ')
+            # Same expression Cypher's MATCH-by-id compiles to (and that
+            # db_connection.ensure_id_indexes builds), so either helper
+            # satisfies the other and no second index family appears
+            ddls = [head.format(sql.Identifier(f'{label}_id_idx'),
+                                sql.Identifier(graph_name, label))
+                    + sql.SQL('(ag_catalog.agtype_access_operator('
+                              'properties, \'"id"\'::agtype))')
+                    for label in vertex_labels]
+            # Endpoint index: MATCH-based edge creation and traversals
+            # resolve (start_id, end_id) without touching the heap
+            ddls += [head.format(sql.Identifier(f'{label}_endpoints_idx'),
+                                 sql.Identifier(graph_name, label))
+                     + sql.SQL('(start_id, end_id)')
+                     for label in edge_labels]
+
+            if concurrently:
+                # CONCURRENTLY cannot run inside a transaction block, so
+                # commit the catalog read and issue each build in
+                # autocommit mode
+                conn.commit()
+                conn.autocommit = True
+                try:
+                    for ddl in ddls:
+                        cur.execute(ddl)
+                finally:
+                    conn.autocommit = False
+            else:
+                # Single semicolon-joined statement: one round-trip for
+                # the whole set instead of one per label
+                cur.execute(sql.SQL(';\n').join(ddls) + sql.SQL(';'))
+                conn.commit()
+
+            print(f"\n{'─'*70}")
+            print(f"Index creation complete:")
+            print(f"  Created (or already present): {len(ddls)}")
+            print(f"{'─'*70}\n")
+
+        except Exception as e:
+            conn.rollback()
+            print(f"\n✗ Error creating indexes: {e}")
+            raise
+        finally:
+            cur.close()
@@ -0,0 +1,69 @@
+# main_agload.py
+"""
+End-to-end pipeline: generate nodes and edges in memory, then bulk load
+them with the AGLoad staging loader — no combined-CSV round-trip.
+"""
+
+import argparse
+import json
+
+import numpy as np
+
+from agload_loader import load_with_agload_from_dataframes
+from config import GRAPH_NAME
+from generate_edges import (generate_edges, works_at_properties,
+                            purchased_properties, knows_properties,
+                            located_in_properties)
+from generate_nodes import (generate_nodes, person_properties,
+                            company_properties, product_properties,
+                            location_properties)
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a graph and load it via age_load')
+    parser.add_argument('--graph-name', type=str, default=GRAPH_NAME,
+                       help='Name of the graph (default: generated_graph)')
+    parser.add_argument('--density', type=float, default=0.05,
+                       help='Edge density between 0 and 1 (default: 0.05)')
+    parser.add_argument('--seed', type=int, default=42,
+                       help='RNG seed for reproducible graphs (default: 42)')
+    parser.add_argument('--emit-intermediate-csv', action='store_true',
+                       help='Also write nodes.csv/edges.csv for the standalone loaders')
+
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    node_types = {
+        'Person': person_properties,
+        'Company': company_properties,
+        'Product': product_properties,
+        'Location': location_properties,
+    }
+    num_nodes = {
+        'Person': 100,
+        'Company': 20,
+        'Product': 50,
+        'Location': 10,
+    }
+    edge_types = {
+        'WORKS_AT': ('Person', 'Company', works_at_properties),
+        'PURCHASED': ('Person', 'Product', purchased_properties),
+        'KNOWS': ('Person', 'Person', knows_properties),
+        'LOCATED_IN': ('Company', 'Location', located_in_properties),
+    }
+
+    nodes_df = generate_nodes(node_types, num_nodes, rng=rng)
+    edges_df = generate_edges(nodes_df, edge_types, args.density, rng=rng)
+    print(f"Generated {len(nodes_df)} nodes and {len(edges_df)} edges")
+
+    # The frames go straight into the loader; the combined CSVs are only
+    # needed by the standalone entry points, so writing them is opt-in
+    if args.emit_intermediate_csv:
+        nodes_df.assign(properties=nodes_df['properties'].map(json.dumps)) \
+            .to_csv('nodes.csv', index=False)
+        edges_df.assign(properties=edges_df['properties'].map(json.dumps)) \
+            .to_csv('edges.csv', index=False)
+
+    load_with_agload_from_dataframes(nodes_df, edges_df, args.graph_name)
+
+if __name__ == "__main__":
+    main()
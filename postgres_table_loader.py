@@ -0,0 +1,706 @@
+# postgres_table_loader.py
+"""
+Load graph data through plain PostgreSQL staging tables.
+
+The DataFrames are COPYed into staging tables first (set-based, very
+fast for very large datasets), then the staged rows are turned into
+Cypher CREATE batches against the AGE graph.
+"""
+
+import csv
+import io
+import itertools
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+try:
+    import orjson
+except ImportError:  # optional accelerator; stdlib json works everywhere
+    orjson = None
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+except ImportError:  # optional: pandas to_csv covers the same path
+    pa = None
+import ast
+import json
+
+from config import GRAPH_NAME
+from db_connection import (get_connection, setup_age_environment, create_graph,
+                           ensure_id_indexes, reset_pool)
+from load_to_age import create_indexes
+
+
+def _dumps(obj):
+    """Serialize a properties dict to JSON text (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj)
+
+
+# Fastest available JSON parser, bound once at import time
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _parse_props(p):
+    """Parse a properties cell: JSON first, legacy str(dict) as fallback."""
+    if not isinstance(p, str):
+        return p
+    try:
+        return json.loads(p)
+    except ValueError:
+        return ast.literal_eval(p)
+
+
+# PGCOPY binary framing: signature + flags + extension-length header,
+# then per row an int16 field count and length-prefixed big-endian
+# payloads, closed by an int16 -1 trailer
+_PGCOPY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('!ii', 0, 0)
+_PGCOPY_TRAILER = struct.pack('!h', -1)
+
+
+def _pgcopy_buffer(rows):
+    """Frame rows (ints as BIGINT, strings as TEXT) for binary COPY."""
+    buf = io.BytesIO()
+    write = buf.write
+    write(_PGCOPY_HEADER)
+    for row in rows:
+        write(struct.pack('!h', len(row)))
+        for field in row:
+            if isinstance(field, str):
+                data = field.encode('utf-8')
+                write(struct.pack('!i', len(data)))
+                write(data)
+            else:
+                write(struct.pack('!iq', 8, int(field)))
+    write(_PGCOPY_TRAILER)
+    buf.seek(0)
+    return buf
+
+
+def _build_nodes_buffer(nodes_df, binary=False):
+    """Build one COPY buffer for a (chunk of a) nodes frame.
+
+    The property JSON comes from load_to_age's exec-compiled per-schema
+    encoders: every row of a label shares one shape, so the generic
+    dict-merge-plus-dumps per row collapses into generated code with the
+    key literals inlined and the id folded in as it formats — the
+    in-tree way of compiling this hot loop down. to_csv then emits the
+    TSV in C rather than a per-row Python loop.
+    """
+    from load_to_age import _make_row_encoder
+
+    id_parts, label_parts, json_parts = [], [], []
+    for label, group in nodes_df.groupby('label', sort=False, observed=True):
+        props = group['properties'].map(_parse_props).to_numpy()
+        ids = group['id'].to_numpy()
+        encode = _make_row_encoder(props[0] or {})
+        json_parts.extend(encode(int(i), p or {})
+                          for p, i in zip(props, ids))
+        id_parts.append(ids)
+        label_parts.extend([label] * len(ids))
+    all_ids = np.concatenate(id_parts) if id_parts else np.array([], dtype=np.int64)
+
+    if binary:
+        # Binary COPY skips the server's per-row text->int64 parse;
+        # properties stay TEXT (utf-8 payload) because the Cypher phase
+        # reads them back as text
+        return _pgcopy_buffer(zip(all_ids, label_parts, json_parts)), 'binary'
+
+    columns = {'id': all_ids, 'label': label_parts, 'properties': json_parts}
+    if pa is not None:
+        return _arrow_csv_buffer(columns), 'csv'
+
+    buf = io.StringIO()
+    pd.DataFrame(columns).to_csv(buf, sep='\t', header=False, index=False,
+                                 quoting=csv.QUOTE_NONE, escapechar='\\')
+    buf.seek(0)
+    return buf, 'text'
+
+
+def _build_edges_buffer(edges_df, binary=False):
+    """Build one COPY buffer for a (chunk of an) edges frame."""
+    props = edges_df['properties'].map(_parse_props)
+    json_props = list(map(_dumps, (p or {} for p in props.to_numpy())))
+
+    if binary:
+        return _pgcopy_buffer(
+            zip(edges_df['from_id'].to_numpy(),
+                edges_df['to_id'].to_numpy(),
+                edges_df['edge_label'].to_numpy(),
+                json_props)), 'binary'
+
+    columns = {
+        'from_id': edges_df['from_id'].to_numpy(),
+        'to_id': edges_df['to_id'].to_numpy(),
+        'edge_label': edges_df['edge_label'].to_numpy(),
+        'properties': json_props,
+    }
+    if pa is not None:
+        return _arrow_csv_buffer(columns), 'csv'
+
+    buf = io.StringIO()
+    pd.DataFrame(columns).to_csv(buf, sep='\t', header=False, index=False,
+                                 quoting=csv.QUOTE_NONE, escapechar='\\')
+    buf.seek(0)
+    return buf, 'text'
+
+
+# Bulk-load session knobs: skip the per-commit fsync wait, give sorts
+# and index builds real memory, and shrink/batch the WAL traffic. Plain
+# SET rather than SET LOCAL so they hold for the whole session.
+_BULK_LOAD_GUCS = (
+    "SET synchronous_commit = off;",
+    "SET maintenance_work_mem = '1GB';",
+    "SET work_mem = '256MB';",
+    "SET wal_compression = on;",
+    "SET commit_delay = 10;",
+)
+
+
+def _set_bulk_load_gucs(cur):
+    for stmt in _BULK_LOAD_GUCS:
+        cur.execute(stmt)
+
+
+def _reset_bulk_load_gucs(cur):
+    """Put the pooled connection back the way we found it.
+
+    Plain SET/RESET are transactional: the caller must commit after
+    this, or putconn's rollback undoes the RESETs and the bulk-load
+    settings leak into every later checkout of the connection.
+    """
+    for stmt in _BULK_LOAD_GUCS:
+        cur.execute("RESET " + stmt.split()[1] + ";")
+
+
+_COPY_SUFFIXES = {
+    'text': "",
+    'csv': " WITH (FORMAT CSV, DELIMITER E'\\t')",
+    'binary': " WITH (FORMAT BINARY)",
+}
+
+
+def _copy_sql(table, columns, fmt):
+    return f"COPY {table} ({', '.join(columns)}) FROM STDIN{_COPY_SUFFIXES[fmt]}"
+
+
+def _arrow_csv_buffer(columns):
+    """Write the staging columns to a tab-delimited byte buffer with Arrow.
+
+    Arrow's CSV writer is multithreaded C++ over columnar data — no
+    per-row Python boxing and no text-mode StringIO that has to be
+    re-encoded on the way out. The result feeds copy_expert as a binary
+    file-like object.
+    """
+    sink = pa.BufferOutputStream()
+    pacsv.write_csv(pa.table(columns), sink,
+                    pacsv.WriteOptions(include_header=False, delimiter='\t'))
+    return io.BytesIO(sink.getvalue())
+
+
+_NODE_COLUMNS = ('id', 'label', 'properties')
+_EDGE_COLUMNS = ('from_id', 'to_id', 'edge_label', 'properties')
+
+
+def _stream_csv_to_copy(cur, path, table, columns, prop_index,
+                        chunk_rows=50_000):
+    """Stream a CSV into COPY, normalizing properties cells to JSON.
+
+    The checked-in CSVs store properties as legacy str(dict) reprs;
+    staged raw, those cells would fail both the server-side ::jsonb
+    casts and the JSON readback. Each cell goes through the usual
+    JSON-first/literal_eval parse and is re-encoded, in bounded chunks
+    so peak memory stays O(chunk) and no DataFrame is built.
+    """
+    staged = 0
+    with open(path, newline='', buffering=1 << 20) as fh:
+        reader = csv.reader(fh)
+        next(reader, None)  # header
+        while True:
+            rows = list(itertools.islice(reader, chunk_rows))
+            if not rows:
+                break
+            buf = io.StringIO()
+            writer = csv.writer(buf, delimiter='\t')
+            for row in rows:
+                row[prop_index] = _dumps(_parse_props(row[prop_index]) or {})
+                writer.writerow(row)
+            buf.seek(0)
+            cur.copy_expert(_copy_sql(table, columns, 'csv'), buf)
+            staged += len(rows)
+    return staged
+
+
+def _stage_nodes_chunk(chunk_df, binary):
+    """Worker: COPY one chunk into stage_nodes over its own connection."""
+    buf, fmt = _build_nodes_buffer(chunk_df, binary)
+    with get_connection() as conn:
+        cur = conn.cursor()
+        try:
+            cur.copy_expert(_copy_sql('stage_nodes', _NODE_COLUMNS, fmt), buf)
+            conn.commit()
+        finally:
+            cur.close()
+    return len(chunk_df)
+
+
+def _stage_edges_chunk(chunk_df, binary):
+    """Worker: COPY one chunk into stage_edges over its own connection."""
+    buf, fmt = _build_edges_buffer(chunk_df, binary)
+    with get_connection() as conn:
+        cur = conn.cursor()
+        try:
+            cur.copy_expert(_copy_sql('stage_edges', _EDGE_COLUMNS, fmt), buf)
+            conn.commit()
+        finally:
+            cur.close()
+    return len(chunk_df)
+
+
+def _apply_edge_batch(cur, execute_sql, batch_rows):
+    """Run one edge batch under a savepoint, bisecting on failure.
+
+    A failed batch rolls back to its savepoint and retries in halves,
+    so one bad row costs O(log batch) re-executes instead of the whole
+    load; the lone offender is skipped with a warning. Returns the
+    number of rows actually applied.
+    """
+    cur.execute("SAVEPOINT edge_batch;")
+    try:
+        cur.execute(execute_sql, (_dumps({'rows': batch_rows}),))
+    except Exception as e:
+        cur.execute("ROLLBACK TO SAVEPOINT edge_batch;")
+        if len(batch_rows) == 1:
+            print(f"  ! Skipped edge {batch_rows[0]['from_id']}->"
+                  f"{batch_rows[0]['to_id']}: {e}")
+            return 0
+        mid = len(batch_rows) // 2
+        return (_apply_edge_batch(cur, execute_sql, batch_rows[:mid])
+                + _apply_edge_batch(cur, execute_sql, batch_rows[mid:]))
+    cur.execute("RELEASE SAVEPOINT edge_batch;")
+    return len(batch_rows)
+
+
+def load_nodes_via_postgres_tables(nodes_df, graph_name=GRAPH_NAME, batch_size=5000,
+                                   binary=False, workers=1, insert_select=False):
+    """COPY nodes into a staging table, then CREATE them in Cypher batches.
+
+    nodes_df may also be a path to a nodes.csv, in which case the file
+    streams from disk into COPY in bounded chunks without ever
+    materializing a DataFrame; the properties cells are normalized to
+    JSON on the way through, so legacy str(dict) CSVs stage cleanly.
+
+    With workers > 1 the COPY phase fans out over a process pool: the
+    chunks stream concurrently into an UNLOGGED stage_nodes table (TEMP
+    tables are invisible to the worker sessions), which PostgreSQL
+    accepts into the same heap from many connections at once.
+    """
+
+    from_file = isinstance(nodes_df, str)
+    if from_file:
+        print(f"\nLoading nodes from {nodes_df} via PostgreSQL staging table...")
+    else:
+        print(f"\nLoading {len(nodes_df):,} nodes via PostgreSQL staging table...")
+        # The frame already knows its labels and sizes; one value_counts
+        # here replaces a full post-COPY scan of the staging table
+        label_counts = {label: int(n)
+                        for label, n in nodes_df['label'].value_counts().items()}
+    start_time = time.time()
+
+    with get_connection() as conn:
+        cur = conn.cursor()
+        try:
+            _set_bulk_load_gucs(cur)
+            if from_file:
+                table = 'temp_nodes'
+                cur.execute("""
+                    CREATE TEMP TABLE temp_nodes (
+                        id BIGINT,
+                        label TEXT,
+                        properties TEXT
+                    );
+                """)
+                # Stream the file in chunks, normalizing each properties
+                # cell to JSON on the way so the server-side ::jsonb
+                # merge on readback always has valid input; the id
+                # property gets folded in server-side on readback
+                staged = _stream_csv_to_copy(cur, nodes_df, table,
+                                             _NODE_COLUMNS, prop_index=2)
+            elif workers > 1:
+                table = 'stage_nodes'
+                cur.execute("""
+                    CREATE UNLOGGED TABLE IF NOT EXISTS stage_nodes (
+                        id BIGINT,
+                        label TEXT,
+                        properties TEXT
+                    );
+                """)
+                cur.execute("TRUNCATE stage_nodes;")
+                conn.commit()  # workers must see the empty table
+
+                chunks = [c for c in np.array_split(nodes_df, workers) if len(c)]
+                # reset_pool: forked workers must not check connections
+                # out of the pool they inherited from this process
+                with ProcessPoolExecutor(max_workers=workers,
+                                         initializer=reset_pool) as executor:
+                    futures = [executor.submit(_stage_nodes_chunk, c, binary)
+                               for c in chunks]
+                    for future in futures:
+                        future.result()
+                staged = len(nodes_df)
+            else:
+                table = 'temp_nodes'
+                cur.execute("""
+                    CREATE TEMP TABLE temp_nodes (
+                        id BIGINT,
+                        label TEXT,
+                        properties TEXT
+                    );
+                """)
+                buf, fmt = _build_nodes_buffer(nodes_df, binary)
+                cur.copy_expert(_copy_sql(table, _NODE_COLUMNS, fmt), buf)
+                staged = len(nodes_df)
+            print(f"  ✓ Staged {staged:,} nodes in {time.time() - start_time:.1f}s")
+
+            # Phase 2: read the staged rows back and CREATE them in Cypher.
+            # Only file staging needs to ask the table what it holds; a
+            # frame's label_counts were computed before any SQL ran
+            if from_file:
+                cur.execute(f"SELECT label, COUNT(*) FROM {table} GROUP BY label;")
+                label_counts = dict(cur.fetchall())
+            labels = list(label_counts)
+
+            loaded = 0
+            if insert_select:
+                # Set-based path: never read the rows back into Python.
+                # Each label table's id column fills from its own sequence
+                # default, and the JSON text casts straight to agtype, so
+                # one INSERT ... SELECT per label replaces the whole
+                # Cypher-build loop.
+                from Csvfreighter_loader import _ensure_label
+                for label in labels:
+                    _ensure_label(cur, graph_name, label, 'v')
+                    cur.execute(f'''
+                        INSERT INTO "{graph_name}"."{label}" (properties)
+                        SELECT (properties::jsonb
+                                || jsonb_build_object('id', id))::text::ag_catalog.agtype
+                        FROM {table}
+                        WHERE label = %s;
+                    ''', (label,))
+                    loaded += cur.rowcount
+                    conn.commit()
+                    print(f"  {label}: {cur.rowcount:,} rows in one INSERT ... SELECT")
+                labels = []  # skip the Cypher-build loop below
+
+            if labels:
+                # One parameterized cursor over every label (planned once,
+                # label values bound rather than pasted into the SQL); each
+                # FETCH resumes the scan where it left off, unlike
+                # LIMIT/OFFSET which re-skips the whole prefix per batch,
+                # and ORDER BY label lets groupby split each batch
+                # client-side. The whole load runs as one transaction -
+                # a single commit (one fsync) at the end, with the staging
+                # table as the retry source if anything fails - so the
+                # cursor needs no WITH HOLD.
+                # The jsonb concat folds the id column into the staged
+                # properties; a no-op when the client already merged it,
+                # and the only copy when staging came straight from a file
+                cur.execute(
+                    f"DECLARE c_nodes CURSOR FOR "
+                    f"SELECT label, "
+                    f"(properties::jsonb || jsonb_build_object('id', id))::text "
+                    f"FROM {table} "
+                    f"WHERE label = ANY(%s) ORDER BY label, id;", (labels,))
+                progress = dict.fromkeys(labels, 0)
+                while True:
+                    cur.execute(f"FETCH {batch_size} FROM c_nodes;")
+                    rows = cur.fetchall()
+                    if not rows:
+                        break
+
+                    for label, group in itertools.groupby(rows, key=lambda r: r[0]):
+                        # Parse the group in one pass before formatting
+                        props_batch = list(map(_loads, (r[1] for r in group)))
+
+                        # One UNWIND statement per group: the server parses
+                        # and plans a single small query and iterates the
+                        # bound $rows array, instead of tokenizing
+                        # batch_size concatenated CREATE clauses. cypher()
+                        # only takes its agtype argument as a prepared-
+                        # statement parameter, hence PREPARE/EXECUTE.
+                        assignments = ', '.join(
+                            f"{key}: row.{key}" for key in props_batch[0])
+                        cur.execute(f"""
+                            PREPARE stage_nodes_batch(agtype) AS
+                            SELECT * FROM cypher('{graph_name}', $$
+                                UNWIND $rows AS row
+                                CREATE (:{label} {{{assignments}}})
+                            $$, $1) as (v agtype);
+                        """)
+                        try:
+                            cur.execute("EXECUTE stage_nodes_batch(%s);",
+                                        (_dumps({'rows': props_batch}),))
+                        finally:
+                            cur.execute("DEALLOCATE stage_nodes_batch;")
+
+                        loaded += len(props_batch)
+                        progress[label] += len(props_batch)
+                        print(f"  {label}: {progress[label]:,}/{label_counts[label]:,}")
+                cur.execute("CLOSE c_nodes;")
+
+            if table == 'stage_nodes':
+                cur.execute("TRUNCATE stage_nodes;")
+            else:
+                cur.execute("DROP TABLE temp_nodes;")
+            conn.commit()
+
+            elapsed = time.time() - start_time
+            print(f"✓ Loaded {loaded:,} nodes in {elapsed:.1f}s "
+                  f"({loaded / elapsed:.0f} nodes/sec)")
+            return loaded
+        except Exception as e:
+            conn.rollback()
+            print(f"✗ Error loading nodes: {e}")
+            raise
+        finally:
+            _reset_bulk_load_gucs(cur)
+            conn.commit()  # the RESETs are transactional too
+            cur.close()
+
+
+def load_edges_via_postgres_tables(edges_df, graph_name=GRAPH_NAME, batch_size=5000,
+                                   binary=False, workers=1, insert_select=False):
+    """COPY edges into a staging table, then MATCH/CREATE them in Cypher batches.
+
+    edges_df may also be a path to an edges.csv, which streams from
+    disk into COPY in bounded chunks without a DataFrame in between,
+    normalizing the properties cells to JSON on the way.
+    """
+
+    from_file = isinstance(edges_df, str)
+    if from_file:
+        print(f"\nLoading edges from {edges_df} via PostgreSQL staging table...")
+    else:
+        print(f"\nLoading {len(edges_df):,} edges via PostgreSQL staging table...")
+        label_counts = {label: int(n)
+                        for label, n in edges_df['edge_label'].value_counts().items()}
+    start_time = time.time()
+
+    with get_connection() as conn:
+        cur = conn.cursor()
+        try:
+            _set_bulk_load_gucs(cur)
+            if from_file:
+                table = 'temp_edges'
+                # edge_id absorbs the file's leading column; the rest of
+                # the phase never reads it
+                cur.execute("""
+                    CREATE TEMP TABLE temp_edges (
+                        edge_id BIGINT,
+                        from_id BIGINT,
+                        to_id BIGINT,
+                        edge_label TEXT,
+                        properties TEXT
+                    );
+                """)
+                staged = _stream_csv_to_copy(
+                    cur, edges_df, table,
+                    ('edge_id', 'edge_label', 'from_id', 'to_id', 'properties'),
+                    prop_index=4)
+            elif workers > 1:
+                table = 'stage_edges'
+                cur.execute("""
+                    CREATE UNLOGGED TABLE IF NOT EXISTS stage_edges (
+                        from_id BIGINT,
+                        to_id BIGINT,
+                        edge_label TEXT,
+                        properties TEXT
+                    );
+                """)
+                cur.execute("TRUNCATE stage_edges;")
+                conn.commit()
+
+                chunks = [c for c in np.array_split(edges_df, workers) if len(c)]
+                with ProcessPoolExecutor(max_workers=workers,
+                                         initializer=reset_pool) as executor:
+                    futures = [executor.submit(_stage_edges_chunk, c, binary)
+                               for c in chunks]
+                    for future in futures:
+                        future.result()
+                staged = len(edges_df)
+            else:
+                table = 'temp_edges'
+                cur.execute("""
+                    CREATE TEMP TABLE temp_edges (
+                        from_id BIGINT,
+                        to_id BIGINT,
+                        edge_label TEXT,
+                        properties TEXT
+                    );
+                """)
+                buf, fmt = _build_edges_buffer(edges_df, binary)
+                cur.copy_expert(_copy_sql(table, _EDGE_COLUMNS, fmt), buf)
+                staged = len(edges_df)
+            print(f"  ✓ Staged {staged:,} edges in {time.time() - start_time:.1f}s")
+
+            # Index the join keys before any lookups: the endpoint columns
+            # on the staging table for the set-based joins, and the vertex
+            # properties id (plus ANALYZE) so each MATCH {id: ...} is an
+            # index probe instead of a full vertex scan per edge
+            cur.execute(f"CREATE INDEX IF NOT EXISTS {table}_from_idx ON {table} (from_id);")
+            cur.execute(f"CREATE INDEX IF NOT EXISTS {table}_to_idx ON {table} (to_id);")
+            conn.commit()
+            ensure_id_indexes(graph_name)
+
+            if from_file:
+                cur.execute(f"SELECT edge_label, COUNT(*) FROM {table} GROUP BY edge_label;")
+                label_counts = dict(cur.fetchall())
+            edge_labels = list(label_counts)
+
+            loaded = 0
+            if insert_select:
+                # Set-based path: resolve both endpoints with joins against
+                # the _ag_label_vertex parent table (every vertex label
+                # inherits from it) instead of per-edge MATCH round-trips
+                from Csvfreighter_loader import _ensure_label
+                for edge_label in edge_labels:
+                    _ensure_label(cur, graph_name, edge_label, 'e')
+                    cur.execute(f'''
+                        INSERT INTO "{graph_name}"."{edge_label}" (start_id, end_id, properties)
+                        SELECT a.id, b.id, s.properties::ag_catalog.agtype
+                        FROM {table} s
+                        JOIN "{graph_name}"."_ag_label_vertex" a
+                          ON ag_catalog.agtype_access_operator(a.properties, '"id"'::ag_catalog.agtype)
+                             = s.from_id::text::ag_catalog.agtype
+                        JOIN "{graph_name}"."_ag_label_vertex" b
+                          ON ag_catalog.agtype_access_operator(b.properties, '"id"'::ag_catalog.agtype)
+                             = s.to_id::text::ag_catalog.agtype
+                        WHERE s.edge_label = %s;
+                    ''', (edge_label,))
+                    loaded += cur.rowcount
+                    conn.commit()
+                    print(f"  {edge_label}: {cur.rowcount:,} rows in one INSERT ... SELECT")
+                edge_labels = []  # skip the Cypher-build loop below
+
+            if edge_labels:
+                cur.execute(
+                    f"DECLARE c_edges CURSOR FOR "
+                    f"SELECT edge_label, from_id, to_id, properties FROM {table} "
+                    f"WHERE edge_label = ANY(%s) ORDER BY edge_label, from_id;",
+                    (edge_labels,))
+                progress = dict.fromkeys(edge_labels, 0)
+                while True:
+                    cur.execute(f"FETCH {batch_size} FROM c_edges;")
+                    rows = cur.fetchall()
+                    if not rows:
+                        break
+
+                    for edge_label, group in itertools.groupby(rows, key=lambda r: r[0]):
+                        batch_rows = []
+                        for _, from_id, to_id, prop_text in group:
+                            props_dict = _loads(prop_text) or {}
+                            batch_rows.append({'from_id': int(from_id),
+                                               'to_id': int(to_id),
+                                               'props': props_dict})
+
+                        # One UNWIND statement per group instead of
+                        # batch_size ';'-joined MATCH/CREATE statements:
+                        # a single parse/plan, and the endpoint lookups
+                        # iterate the bound $rows array server-side.
+                        # MERGE on the full property map makes retries
+                        # idempotent - a re-run batch matches the edges
+                        # it already created instead of duplicating them.
+                        prop_keys = batch_rows[0]['props'].keys()
+                        assignments = ', '.join(
+                            f"{key}: row.props.{key}" for key in prop_keys)
+                        cur.execute(f"""
+                            PREPARE stage_edges_batch(agtype) AS
+                            SELECT * FROM cypher('{graph_name}', $$
+                                UNWIND $rows AS row
+                                MATCH (a {{id: row.from_id}}), (b {{id: row.to_id}})
+                                MERGE (a)-[:{edge_label} {{{assignments}}}]->(b)
+                            $$, $1) as (e agtype);
+                        """)
+                        try:
+                            applied = _apply_edge_batch(
+                                cur, "EXECUTE stage_edges_batch(%s);", batch_rows)
+                        finally:
+                            cur.execute("DEALLOCATE stage_edges_batch;")
+
+                        # Only rows that actually went in are counted
+                        loaded += applied
+                        progress[edge_label] += applied
+                        print(f"  {edge_label}: {progress[edge_label]:,}"
+                              f"/{label_counts[edge_label]:,}")
+                cur.execute("CLOSE c_edges;")
+
+            if table == 'stage_edges':
+                cur.execute("TRUNCATE stage_edges;")
+            else:
+                cur.execute("DROP TABLE temp_edges;")
+            conn.commit()
+
+            elapsed = time.time() - start_time
+            print(f"✓ Loaded {loaded:,} edges in {elapsed:.1f}s "
+                  f"({loaded / elapsed:.0f} edges/sec)")
+            return loaded
+        except Exception as e:
+            conn.rollback()
+            print(f"✗ Error loading edges: {e}")
+            raise
+        finally:
+            _reset_bulk_load_gucs(cur)
+            conn.commit()  # the RESETs are transactional too
+            cur.close()
+
+
+def postgres_table_load(nodes_df, edges_df, graph_name=GRAPH_NAME, batch_size=5000,
+                        binary=False, workers=1, insert_select=False):
+    """Full pipeline: stage and load nodes, then edges, then build indexes."""
+    setup_age_environment()
+    create_graph(graph_name)
+
+    load_nodes_via_postgres_tables(nodes_df, graph_name, batch_size,
+                                   binary=binary, workers=workers,
+                                   insert_select=insert_select)
+    # Vertex id indexes must exist before the edge phase: every MATCH
+    # {id: ...} probes them, so building them here turns the per-edge
+    # lookup from O(V) into O(log V)
+    create_indexes(graph_name)
+    load_edges_via_postgres_tables(edges_df, graph_name, batch_size,
+                                   binary=binary, workers=workers,
+                                   insert_select=insert_select)
+    # Once more for the edge label tables created above (endpoint indexes)
+    create_indexes(graph_name)
+
+    print("\n✓ Loading complete!\n")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Load graph data via PostgreSQL staging tables')
+    parser.add_argument('--graph-name', type=str, default=GRAPH_NAME,
+                       help='Name of the graph')
+    parser.add_argument('--batch-size', type=int, default=5000,
+                       help='Rows per Cypher batch (default: 5000)')
+    parser.add_argument('--binary', action='store_true',
+                       help='Stage with binary COPY instead of text TSV')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Concurrent COPY processes for staging (default: 1)')
+    parser.add_argument('--insert-select', action='store_true',
+                       help='Load straight from the staging tables with set-based '
+                            'INSERT ... SELECT instead of Cypher batches')
+
+    args = parser.parse_args()
+
+    # The file paths go straight to the loaders, which stream them into
+    # COPY: no whole-file pandas parse, no DataFrame copy of the CSVs
+    postgres_table_load('nodes.csv', 'edges.csv', args.graph_name, args.batch_size,
+                        binary=args.binary, workers=args.workers,
+                        insert_select=args.insert_select)
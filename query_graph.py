@@ -0,0 +1,75 @@
+# query_graph.py
+"""Run ad-hoc Cypher queries against an Apache AGE graph."""
+
+from config import GRAPH_NAME
+from db_connection import get_connection
+
+
+def run_cypher_query(cypher_query, graph_name=GRAPH_NAME, columns=('result',),
+                     itersize=1000):
+    """Execute a Cypher query, yielding result rows as they stream in.
+
+    A named server-side cursor fetches itersize rows at a time, so even
+    a full-graph MATCH iterates in constant client memory instead of a
+    fetchall() materializing everything at once; wrap the call in
+    list(...) when a concrete list is needed. The connection comes from
+    the shared pool, which already ran the LOAD 'age' / search_path
+    prelude once per physical connection, so no per-call session setup
+    is paid. columns names the agtype columns of cypher()'s result set,
+    one per RETURN expression.
+    """
+    column_clause = ', '.join(f"{name} agtype" for name in columns)
+    with get_connection() as conn:
+        cur = conn.cursor(name='cypher_stream', itersize=itersize)
+        try:
+            cur.execute(f"""
+                SELECT * FROM cypher('{graph_name}', $$
+                    {cypher_query}
+                $$) as ({column_clause});
+            """)
+            yield from cur
+        finally:
+            cur.close()
+            # Named cursors open a transaction; end it before the
+            # connection goes back to the pool
+            conn.commit()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run demo Cypher queries against the graph')
+    parser.add_argument('--graph-name', type=str, default=GRAPH_NAME,
+                       help='Name of the graph (default: generated_graph)')
+
+    args = parser.parse_args()
+
+    demos = [
+        ("Ten people",
+         "MATCH (p:Person) RETURN p.name LIMIT 10", ('name',)),
+        ("Ten companies",
+         "MATCH (c:Company) RETURN c.name LIMIT 10", ('name',)),
+        ("Ten products",
+         "MATCH (p:Product) RETURN p.name, p.price LIMIT 10", ('name', 'price')),
+        ("Who works where",
+         "MATCH (p:Person)-[:WORKS_AT]->(c:Company) "
+         "RETURN p.name, c.name LIMIT 10", ('person', 'company')),
+        ("Recent purchases",
+         "MATCH (p:Person)-[r:PURCHASED]->(pr:Product) "
+         "RETURN p.name, pr.name LIMIT 10", ('person', 'product')),
+        ("Friend pairs",
+         "MATCH (a:Person)-[:KNOWS]->(b:Person) "
+         "RETURN a.name, b.name LIMIT 10", ('a', 'b')),
+        ("Company locations",
+         "MATCH (c:Company)-[:LOCATED_IN]->(l:Location) "
+         "RETURN c.name, l.name LIMIT 10", ('company', 'location')),
+        ("Best connected people",
+         "MATCH (p:Person)-[:KNOWS]-() "
+         "RETURN p.name, count(*) AS degree ORDER BY degree DESC LIMIT 10",
+         ('name', 'degree')),
+    ]
+
+    for title, query, columns in demos:
+        print(f"\n{title}:")
+        for row in run_cypher_query(query, args.graph_name, columns):
+            print(f"  {' | '.join(str(v) for v in row)}")
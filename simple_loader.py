@@ -24,17 +24,18 @@ def main():
     setup_age_environment()
     create_graph(args.graph_name)
     
-    # Load data
-    print("\nReading CSV files...")
-    nodes_df = pd.read_csv('nodes.csv')
-    edges_df = pd.read_csv('edges.csv')
-    
-    print(f"Loaded {len(nodes_df):,} nodes and {len(edges_df):,} edges from CSV\n")
-    
-    # Load with proven method
-    print(f"Using batch size: {args.batch_size}\n")
-    load_nodes_to_age(nodes_df, args.graph_name, args.batch_size)
-    load_edges_to_age(edges_df, args.graph_name, args.batch_size)
+    # Load with proven method, streaming the CSVs in bounded chunks so
+    # peak memory stays O(chunk) instead of O(file)
+    print(f"\nUsing batch size: {args.batch_size}\n")
+    total_nodes = 0
+    for chunk in pd.read_csv('nodes.csv', chunksize=100_000):
+        load_nodes_to_age(chunk, args.graph_name, args.batch_size)
+        total_nodes += len(chunk)
+    total_edges = 0
+    for chunk in pd.read_csv('edges.csv', chunksize=100_000):
+        load_edges_to_age(chunk, args.graph_name, args.batch_size)
+        total_edges += len(chunk)
+    print(f"Loaded {total_nodes:,} nodes and {total_edges:,} edges from CSV")
     create_indexes(args.graph_name)
     
     print("\n✓ Loading complete!\n")
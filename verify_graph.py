@@ -0,0 +1,162 @@
+# verify_graph.py
+"""Thorough verification of a loaded Apache AGE graph.
+
+Runs a battery of probes — counts, label breakdowns, samples, and
+integrity checks — and compares the totals against the source CSVs.
+"""
+
+import os
+
+from config import GRAPH_NAME
+from db_connection import get_connection
+
+
+def _count_rows(path):
+    """Count data rows with one buffered byte scan.
+
+    The comparison only needs an integer, so no DataFrame is built:
+    the file streams through in 1 MiB blocks and only the newlines are
+    counted.
+    """
+    with open(path, 'rb', buffering=1 << 20) as fh:
+        newlines = sum(block.count(b'\n')
+                       for block in iter(lambda: fh.read(1 << 20), b''))
+    return max(newlines - 1, 0)  # minus the header
+
+
+def run_query(cur, cypher_query, graph_name=GRAPH_NAME, columns=('result',)):
+    """Run a Cypher query on an open cursor and return all rows.
+
+    The cursor comes in from the caller, so one connection — whose
+    pooled setup already ran the LOAD 'age' / search_path prelude —
+    serves every probe, instead of paying connection setup and session
+    DDL once per query. columns names the agtype columns of cypher()'s
+    result set, one per RETURN expression.
+    """
+    column_clause = ', '.join(f"{name} agtype" for name in columns)
+    cur.execute(f"""
+        SELECT * FROM cypher('{graph_name}', $$
+            {cypher_query}
+        $$) as ({column_clause});
+    """)
+    return cur.fetchall()
+
+
+def run_sql_query(cur, sql_query, params=None):
+    """Run a plain SQL query on an open cursor and return all rows."""
+    cur.execute(sql_query, params)
+    return cur.fetchall()
+
+
+def verify_graph(graph_name=GRAPH_NAME):
+    """Verify the graph's contents and integrity.
+
+    All database probes share one pooled connection, and overlapping
+    probes are fused: the totals fall out of the same result sets as
+    the label breakdowns, and the duplicate-id and missing-id checks
+    share one pass over the vertices. The CSV comparison at the end
+    touches only the local files, after the connection is back in the
+    pool.
+    """
+    print(f"\nVerifying graph: {graph_name}")
+    print("=" * 60)
+    problems = []
+
+    with get_connection() as conn:
+        cur = conn.cursor()
+        try:
+            # 1-2. Label breakdowns; the totals are just the sums of
+            # these result sets, so four probes cost two round-trips
+            node_rows = run_query(
+                cur, "MATCH (n) RETURN label(n), count(*)",
+                graph_name, columns=('label', 'count'))
+            edge_rows = run_query(
+                cur, "MATCH ()-[r]->() RETURN type(r), count(*)",
+                graph_name, columns=('label', 'count'))
+            node_count = sum(int(str(c)) for _, c in node_rows)
+            edge_count = sum(int(str(c)) for _, c in edge_rows)
+            print(f"\n1. Nodes: {node_count:,}")
+            for label, count in node_rows:
+                print(f"   {label}: {count}")
+            print(f"\n2. Edges: {edge_count:,}")
+            for label, count in edge_rows:
+                print(f"   {label}: {count}")
+
+            # 3. Sample nodes
+            print("\n3. Sample nodes:")
+            for (node,) in run_query(cur, "MATCH (n) RETURN n LIMIT 3",
+                                     graph_name):
+                print(f"   {node}")
+
+            # 4. Sample edges
+            print("\n4. Sample edges:")
+            for a, rel, b in run_query(
+                    cur,
+                    "MATCH (a)-[r]->(b) RETURN a.id, type(r), b.id LIMIT 3",
+                    graph_name, columns=('a', 'rel', 'b')):
+                print(f"   {a} -[{rel}]-> {b}")
+
+            # 5. Orphaned nodes (no edge in either direction). AGE
+            # stores every vertex and edge as rows of the _ag_label_*
+            # parent tables, so this is a plain anti-join the planner
+            # can hash instead of a Cypher pass over the whole graph
+            orphans = run_sql_query(cur, f'''
+                SELECT count(*)
+                FROM "{graph_name}"."_ag_label_vertex" v
+                LEFT JOIN "{graph_name}"."_ag_label_edge" e
+                  ON v.id IN (e.start_id, e.end_id)
+                WHERE e.id IS NULL;
+            ''')[0][0]
+            print(f"\n5. Orphaned nodes: {orphans:,}")
+
+            # 6. Duplicate and missing external ids in one vertex pass,
+            # again as straight SQL over the parent vertex table
+            duplicates, missing = run_sql_query(cur, f'''
+                SELECT count(*) FILTER (WHERE id IS NOT NULL AND n > 1),
+                       COALESCE(sum(n) FILTER (WHERE id IS NULL), 0)
+                FROM (
+                    SELECT agtype_access_operator(properties,
+                                                  '"id"'::agtype) AS id,
+                           count(*) AS n
+                    FROM "{graph_name}"."_ag_label_vertex"
+                    GROUP BY 1
+                ) ids;
+            ''')[0]
+            print(f"6. Duplicate node ids: {duplicates:,}")
+            print(f"7. Nodes without id property: {missing:,}")
+            if duplicates:
+                problems.append(f"{duplicates} duplicate node ids")
+            if missing:
+                problems.append(f"{missing} nodes without an id property")
+        finally:
+            cur.close()
+
+    # 8. Compare against the source CSVs — needs no database at all,
+    # so it runs after the connection is released
+    print("\n8. CSV comparison:")
+    for path, loaded, what in (('nodes.csv', node_count, 'nodes'),
+                               ('edges.csv', edge_count, 'edges')):
+        if not os.path.exists(path):
+            print(f"   {path} not found, skipping")
+            continue
+        expected = _count_rows(path)
+        status = "✓" if expected == loaded else "✗"
+        print(f"   {status} {what}: {loaded:,} loaded / "
+              f"{expected:,} in {path}")
+        if expected != loaded:
+            problems.append(
+                f"{what}: {loaded} loaded vs {expected} in {path}")
+
+    print("\n" + "=" * 60)
+    if problems:
+        print("✗ Verification found problems:")
+        for problem in problems:
+            print(f"  - {problem}")
+    else:
+        print("✓ Graph verified — no problems found")
+    return not problems
+
+
+if __name__ == "__main__":
+    import sys
+    verify_graph(sys.argv[1] if len(sys.argv) > 1 else GRAPH_NAME)